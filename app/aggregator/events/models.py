@@ -1,10 +1,11 @@
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 from sqlalchemy import DateTime, ForeignKey, Integer, String
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
 from app.aggregator.tickets.models import Ticket
 from app.database import Base
@@ -54,6 +55,17 @@ class Event(Base):
         DateTime(timezone=True), nullable=True
     )
 
+    content_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    # Событие пропало из каталога провайдера (выявлено полной сверкой)
+    removed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     place: Mapped["Place"] = relationship(
         "Place", back_populates="events", lazy="selectin"
     )
@@ -64,3 +76,23 @@ class Event(Base):
 
     def __repr__(self) -> str:
         return f"Event({self.name}, {self.event_time})"
+
+
+class SharedSeats(Base):
+    """Общий для всех воркеров кэш свободных мест (L2 за кэшем процесса).
+
+    UNLOGGED: после сбоя Postgres таблица пустеет, и это нормально - места
+    просто заново запросятся у провайдера, а WAL на частые записи не тратим.
+    """
+
+    __tablename__ = "seats_cache"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+
+    seats: Mapped[List[str]] = mapped_column(JSONB, nullable=False)
+
+    # по нему чистка находит устаревшие записи, не сканируя таблицу
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
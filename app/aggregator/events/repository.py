@@ -1,11 +1,24 @@
-from datetime import date
-from typing import Optional
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.aggregator.events.models import Event
+from app.aggregator.events.models import Event, SharedSeats
+from app.database import UPSERT_CHUNK_SIZE
+
+EVENT_UPDATE_COLUMNS = (
+    "name",
+    "place_id",
+    "event_time",
+    "registration_deadline",
+    "status",
+    "number_of_visitors",
+    "changed_at",
+    "status_changed_at",
+)
 
 
 class EventRepository:
@@ -31,6 +44,44 @@ class EventRepository:
         self.session.add(event)
         await self.session.flush()
 
+    async def upsert_many(
+        self, rows: List[Dict[str, Any]], only_changed: bool = True
+    ) -> Tuple[int, int]:
+        """Пакетная вставка/обновление событий через INSERT ... ON CONFLICT.
+
+        Строки с неизменившимся content_hash не перезаписываются, если не
+        передан only_changed=False (нужно, чтобы отметить свежесть строки).
+        Возвращает количество вставленных и обновлённых строк.
+        """
+        table = Event.__table__
+        inserted = updated = 0
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = insert(table).values(rows[start : start + UPSERT_CHUNK_SIZE])
+            set_ = {
+                column: stmt.excluded[column]
+                for column in (*EVENT_UPDATE_COLUMNS, "content_hash")
+            }
+            set_["synced_at"] = func.now()
+            # вернувшееся в каталог событие снимаем с пометки даже без изменений
+            set_["removed_at"] = None
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.id],
+                set_=set_,
+                where=or_(
+                    table.c.content_hash.is_distinct_from(stmt.excluded.content_hash),
+                    table.c.removed_at.is_not(None),
+                )
+                if only_changed
+                else None,
+            ).returning(literal_column("xmax = 0").label("inserted"))
+            result = await self.session.execute(stmt)
+            for (is_insert,) in result:
+                if is_insert:
+                    inserted += 1
+                else:
+                    updated += 1
+        return inserted, updated
+
     async def events_list(
         self,
         date_from: Optional[date] = None,
@@ -39,10 +90,15 @@ class EventRepository:
     ):
         """Возвращает список событий с пагинацией и общее количество events"""
         query = (
-            select(Event).options(selectinload(Event.place)).order_by(Event.event_time)
+            select(Event)
+            .options(selectinload(Event.place))
+            .where(Event.removed_at.is_(None))
+            .order_by(Event.event_time)
         )
 
-        count_query = select(func.count()).select_from(Event)
+        count_query = (
+            select(func.count()).select_from(Event).where(Event.removed_at.is_(None))
+        )
 
         if date_from:
             query = query.where(Event.event_time >= date_from)
@@ -56,3 +112,44 @@ class EventRepository:
         result = await self.session.execute(query)
         events = result.scalars().all()
         return events, total
+
+
+class SharedSeatsRepository:
+    """Репозиторий общего кэша свободных мест"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_fresh(self, event_id: str, max_age: float) -> Optional[List[str]]:
+        """Места, полученные не раньше max_age секунд назад по часам БД"""
+        result = await self.session.execute(
+            select(SharedSeats.seats).where(
+                SharedSeats.event_id == event_id,
+                SharedSeats.fetched_at > func.now() - timedelta(seconds=max_age),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def put(self, event_id: str, seats: List[str]) -> None:
+        """Записывает места события"""
+        stmt = insert(SharedSeats).values(event_id=event_id, seats=seats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SharedSeats.event_id],
+            set_={"seats": stmt.excluded.seats, "fetched_at": func.now()},
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def prune(self, max_age: float) -> int:
+        """Удаляет записи старше max_age секунд, возвращает их число.
+
+        Без чистки в таблице оседала бы строка на каждое когда-либо
+        запрошенное событие.
+        """
+        result = await self.session.execute(
+            delete(SharedSeats).where(
+                SharedSeats.fetched_at < func.now() - timedelta(seconds=max_age)
+            )
+        )
+        await self.session.commit()
+        return result.rowcount
@@ -87,5 +87,5 @@ async def get_event_seats(
     if event.status != "published":
         raise EventNotPublished
 
-    seats = await get_available_seats(str(event_id), client)
-    return SeatsResponse(event_id=event_id, available_seats=seats)
+    seats = await get_available_seats(str(event_id), client, event.place.seats_pattern)
+    return SeatsResponse(event_id=event_id, available_seats=seats.to_list())
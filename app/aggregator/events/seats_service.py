@@ -1,38 +1,115 @@
 import asyncio
-import time
-from typing import Dict, List, Tuple
+import random
+from typing import Any, Dict, List
 
 from aiohttp import ClientConnectorError
+from sqlalchemy.exc import SQLAlchemyError
 
+from app.aggregator.events.repository import SharedSeatsRepository
+from app.aggregator.exceptions import ProviderNetworkError
+from app.aggregator.places.seat_map import SeatSet, layout_for
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.logger import logger
 from app.provider.client import EventsProviderClient
-from app.provider.exceptions import EventsProviderError
+from app.provider.exceptions import EventsProviderError, ProviderCircuitOpenError
+from app.ttl_cache import TTLCache
 
-_seats_cache: Dict[str, Tuple[float, List[str]]] = {}
-_cache_lock = asyncio.Lock()
-CACHE_TTL = 30  # секунд
+# Одновременные промахи по одному событию делят один запрос к провайдеру
+# и его результат или ошибку; устаревшие места отдаются сразу, пока
+# в фоне идёт одно обновление. С общим кэшем кэш процесса живёт коротко
+# и без окна устаревания, чтобы воркеры не расходились дольше него
+if settings.SEATS_SHARED_CACHE_ENABLED:
+    _seats_cache: TTLCache[SeatSet] = TTLCache(
+        max_entries=settings.SEATS_CACHE_SIZE,
+        ttl=settings.SEATS_SHARED_CACHE_L1_SECONDS,
+    )
+else:
+    _seats_cache = TTLCache(
+        max_entries=settings.SEATS_CACHE_SIZE,
+        ttl=settings.SEATS_CACHE_TTL_SECONDS,
+        stale_ttl=settings.SEATS_CACHE_STALE_SECONDS,
+    )
 
 
 async def get_available_seats(
     event_id: str,
     client: EventsProviderClient,
-) -> List[str]:
+    seats_pattern: str = "",
+) -> SeatSet:
+    """Свободные места события, собранные в битовую карту по схеме зала.
 
-    async with _cache_lock:
-        cached = _seats_cache.get(event_id)
-        if cached is not None and time.time() - cached[0] < CACHE_TTL:
-            return cached[1]
+    В кэше процесса лежит карта, а не список строк; в строки места
+    разворачиваются только для ответа (SeatSet.to_list()).
+    """
+    return await _seats_cache.get(
+        event_id, lambda: _load_seat_set(event_id, client, seats_pattern)
+    )
 
+
+def seats_cache_stats() -> Dict[str, Any]:
+    """Счётчики кэша мест для диагностики"""
+    return _seats_cache.snapshot()
+
+
+async def _load_seat_set(
+    event_id: str, client: EventsProviderClient, seats_pattern: str
+) -> SeatSet:
+    return layout_for(seats_pattern).compile(await _load_seats(event_id, client))
+
+
+async def _load_seats(event_id: str, client: EventsProviderClient) -> List[str]:
+    """Промах кэша процесса: общий кэш (если включён), затем провайдер.
+
+    При SEATS_SHARED_CACHE_ENABLED воркеры делят ответы провайдера через
+    таблицу seats_cache; показываемые места расходятся между воркерами не
+    дольше SEATS_SHARED_CACHE_L1_SECONDS. Недоступность БД не ломает
+    ответ - места просто берутся у провайдера.
+    """
+    if not settings.SEATS_SHARED_CACHE_ENABLED:
+        return await _fetch_seats(event_id, client)
+
+    try:
+        async with AsyncSessionLocal() as session:
+            seats = await SharedSeatsRepository(session).get_fresh(
+                event_id, settings.SEATS_SHARED_CACHE_TTL_SECONDS
+            )
+    except SQLAlchemyError as e:
+        logger.warning(
+            "Общий кэш мест недоступен", extra={"event_id": event_id, "error": str(e)}
+        )
+        return await _fetch_seats(event_id, client)
+    if seats is not None:
+        return seats
+
+    seats = await _fetch_seats(event_id, client)
+    try:
+        async with AsyncSessionLocal() as session:
+            repo = SharedSeatsRepository(session)
+            await repo.put(event_id, seats)
+            # чистка - отдельной транзакцией и лишь изредка, а не на каждом промахе
+            if random.random() < settings.SEATS_SHARED_CACHE_PRUNE_PROBABILITY:
+                await repo.prune(settings.SEATS_SHARED_CACHE_TTL_SECONDS)
+    except SQLAlchemyError as e:
+        logger.warning(
+            "Не удалось записать места в общий кэш",
+            extra={"event_id": event_id, "error": str(e)},
+        )
+    return seats
+
+
+async def _fetch_seats(event_id: str, client: EventsProviderClient) -> List[str]:
+    """Запрашивает места у провайдера"""
     try:
-        seats = await client.get_event_seats(event_id)
+        return await client.get_event_seats(event_id)
     except (ClientConnectorError, asyncio.TimeoutError):
         raise
 
+    except ProviderCircuitOpenError:
+        raise ProviderNetworkError()
+
     except EventsProviderError:
         raise
 
     except Exception:
         raise
-
-    async with _cache_lock:
-        _seats_cache[event_id] = (time.time(), seats)
-    return seats
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import DateTime, String, Text
 from sqlalchemy.dialects.postgresql import UUID
@@ -35,6 +35,8 @@ class Place(Base):
         DateTime(timezone=True), nullable=False
     )
 
+    content_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+
     events: Mapped[list["Event"]] = relationship(
         "Event", back_populates="place", lazy="selectin"
     )
@@ -1,9 +1,13 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.aggregator.places.models import Place
+from app.database import UPSERT_CHUNK_SIZE
+
+PLACE_UPDATE_COLUMNS = ("name", "city", "address", "seats_pattern", "changed_at")
 
 
 class PlaceRepository:
@@ -21,3 +25,29 @@ class PlaceRepository:
         """Сохранение места проведения в БД"""
         self.session.add(place)
         await self.session.flush()
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Пакетная вставка/обновление площадок через INSERT ... ON CONFLICT.
+
+        Строки с неизменившимся content_hash не перезаписываются.
+        Возвращает количество вставленных и обновлённых строк.
+        """
+        table = Place.__table__
+        inserted = updated = 0
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = insert(table).values(rows[start : start + UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.id],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in (*PLACE_UPDATE_COLUMNS, "content_hash")
+                },
+                where=table.c.content_hash.is_distinct_from(stmt.excluded.content_hash),
+            ).returning(literal_column("xmax = 0").label("inserted"))
+            result = await self.session.execute(stmt)
+            for (is_insert,) in result:
+                if is_insert:
+                    inserted += 1
+                else:
+                    updated += 1
+        return inserted, updated
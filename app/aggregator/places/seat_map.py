@@ -0,0 +1,148 @@
+import re
+from collections import deque
+from functools import lru_cache
+from itertools import compress, repeat
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from app.logger import logger
+
+_PATTERN_PART = re.compile(r"^\s*(\D+?)(\d+)-(\d+)\s*$")
+
+# Байт-на-место (0/1) <-> строка из '0'/'1': через неё битовая карта
+# упаковывается и распаковывается int(..., 2) без цикла на Python
+_FLAG_TO_DIGIT = bytes.maketrans(b"\x00\x01", b"01")
+_DIGIT_TO_FLAG = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class SeatLayout:
+    """Схема зала из seats_pattern площадки: место <-> номер позиции.
+
+    'A1-1000,B1-2000' - ряд A с местами 1..1000 занимает позиции 0..999,
+    ряд B - позиции 1000..2999. Нераспознанные части шаблона пропускаются,
+    такие места попадут в SeatSet как «лишние» строки.
+
+    Имена мест и индекс имя -> позиция строятся один раз на схему и общие
+    для всех событий площадки: сборка карты - поиск в словаре на место,
+    а развёрнутый список ссылается на те же строки.
+    """
+
+    def __init__(self, seats_pattern: str):
+        self.seats_pattern = seats_pattern
+        # ряд -> (первый номер, последний номер, позиция первого места)
+        self._rows: Dict[str, Tuple[int, int, int]] = {}
+        self._order: List[str] = []
+        self._names: Optional[List[str]] = None
+        self._positions: Optional[Dict[str, int]] = None
+        self.size = 0
+        for part in filter(None, seats_pattern.split(",")):
+            match = _PATTERN_PART.match(part)
+            if match is None or match.group(1) in self._rows:
+                logger.warning(
+                    "Не удалось разобрать часть seats_pattern",
+                    extra={"seats_pattern": seats_pattern, "part": part},
+                )
+                continue
+            row, first, last = match.group(1), int(match.group(2)), int(match.group(3))
+            if last < first:
+                continue
+            self._rows[row] = (first, last, self.size)
+            self._order.append(row)
+            self.size += last - first + 1
+
+    @property
+    def names(self) -> List[str]:
+        """Имена мест по позициям"""
+        if self._names is None:
+            self._names = [
+                f"{row}{number}"
+                for row in self._order
+                for number in range(self._rows[row][0], self._rows[row][1] + 1)
+            ]
+        return self._names
+
+    def position(self, seat: str) -> Optional[int]:
+        """Позиция места или None, если его нет в схеме"""
+        if self._positions is None:
+            self._positions = {name: index for index, name in enumerate(self.names)}
+        return self._positions.get(seat)
+
+    def compile(self, seats: Iterable[str]) -> "SeatSet":
+        """Свободные места провайдера -> битовая карта по позициям схемы.
+
+        Карта заполняется раз на заполнение кэша; все шаги - встроенные
+        map/translate/int, а не цикл на Python по 50 000 мест.
+        """
+        seats = list(seats)
+        self.position("")
+        positions = list(map(self._positions.get, seats))
+        extra: FrozenSet[str] = frozenset()
+        if None in positions:
+            extra = frozenset(
+                seat for seat, position in zip(seats, positions) if position is None
+            )
+            positions = [position for position in positions if position is not None]
+
+        flags = bytearray(self.size)
+        deque(map(flags.__setitem__, positions, repeat(1)), maxlen=0)
+        # позиция 0 - младший бит: строку цифр разворачиваем
+        packed = int(flags.translate(_FLAG_TO_DIGIT)[::-1] or b"0", 2)
+        bits = packed.to_bytes((self.size + 7) // 8, "little")
+        return SeatSet(self, bits, flags.count(1), extra)
+
+
+@lru_cache(maxsize=256)
+def layout_for(seats_pattern: str) -> SeatLayout:
+    """Схема по шаблону; у многих событий шаблон общий, разбираем его раз"""
+    return SeatLayout(seats_pattern)
+
+
+class SeatSet:
+    """Свободные места события: бит на позицию схемы зала.
+
+    Проверка места - O(1) без разворачивания списка; для зала на 50 000
+    мест карта занимает ~6 КБ. Развёрнутый для ответа список ссылается на
+    общие строки схемы (SeatLayout.names), а не создаёт свои. Места вне
+    схемы (провайдер прислал то, чего нет в seats_pattern) хранятся
+    отдельным множеством, чтобы ничего не потерять.
+    """
+
+    __slots__ = ("layout", "_bits", "_count", "_extra")
+
+    def __init__(
+        self, layout: SeatLayout, bits: bytes, count: int, extra: FrozenSet[str]
+    ):
+        self.layout = layout
+        self._bits = bits
+        self._count = count
+        self._extra = extra
+
+    def __contains__(self, seat: object) -> bool:
+        if not isinstance(seat, str):
+            return False
+        position = self.layout.position(seat)
+        if position is None:
+            return seat in self._extra
+        return bool(self._bits[position >> 3] & (1 << (position & 7)))
+
+    def __len__(self) -> int:
+        return self._count + len(self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        """Места в порядке схемы, затем места вне её"""
+        return iter(self.to_list())
+
+    def to_list(self) -> List[str]:
+        """Места строками для ответа клиенту.
+
+        Новый список на каждый вызов: в кэше остаётся только карта, а
+        разворачивание - встроенные format/translate/compress, ~1 мс на
+        50 000 мест.
+        """
+        size = self.layout.size
+        seats: List[str] = []
+        if size:
+            digits = format(int.from_bytes(self._bits, "little"), f"0{size}b")
+            flags = digits[::-1].encode().translate(_DIGIT_TO_FLAG)
+            seats = list(compress(self.layout.names, flags))
+        seats.extend(sorted(self._extra))
+        return seats
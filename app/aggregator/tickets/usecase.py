@@ -27,7 +27,7 @@ from app.aggregator.tickets.outbox.repository import OutboxRepository
 from app.aggregator.tickets.repository import TicketRepository
 from app.logger import logger
 from app.provider.client import EventsProviderClient
-from app.provider.exceptions import EventsProviderError, ProviderTemporaryError
+from app.provider.exceptions import EventsProviderError, ProviderCircuitOpenError
 from app.sync.usecase import SyncEventsUsecase
 
 
@@ -102,8 +102,12 @@ class CreateTicketUsecase:
                 return UUID(ticket_id_str)
 
         try:
-            await self.sync_events.execute()
-        except (ProviderTemporaryError, EventsProviderError) as e:
+            await self.sync_events.refresh_event(str(event_id))
+        except ProviderCircuitOpenError:
+            raise ProviderNetworkError()
+        except EventsProviderError as e:
+            if e.status == 404:
+                raise EventNotFoundException
             logger.exception(
                 "Ошибка при попытке синхронизировать данные перед регистрацией",
                 extra={"error": e},
@@ -122,6 +126,8 @@ class CreateTicketUsecase:
         ):
             raise EventPassed
         try:
+            # места перед покупкой - всегда свежие, мимо кэша; одна проверка
+            # по списку дешевле, чем собирать из него битовую карту
             available = await self.client.get_event_seats(str(event_id))
             if seat not in available:
                 raise TicketUnRegistrationError(f"Место {seat} недоступно")
@@ -129,19 +135,23 @@ class CreateTicketUsecase:
         except TicketUnRegistrationError:
             raise
 
+        except ProviderCircuitOpenError:
+            raise ProviderNetworkError()
+
         except Exception as e:
             logger.error("Внутренняя ошибка сервера", extra={"error": e})
             raise TicketRegistrationError(detail="Внутренняя ошибка сервера")
 
         try:
-            response = await asyncio.to_thread(
-                self.client.register,
+            response = await self.client.register(
                 event_id=str(event_id),
                 first_name=first_name,
                 last_name=last_name,
                 email=email,
                 seat=seat,
             )
+        except ProviderCircuitOpenError:
+            raise ProviderNetworkError()
         except EventsProviderError:
             raise TicketUnRegistrationError(
                 "Ошибка регистрации. Возможно, место уже занято."
@@ -222,6 +232,8 @@ class CancelTicketUsecase:
             if not response.get("success"):
                 raise ProviderUnexpectedResponse()
 
+        except ProviderCircuitOpenError:
+            raise ProviderNetworkError()
         except EventsProviderError:
             raise TicketUnRegistrationError("Не удалось отменить регистрацию")
 
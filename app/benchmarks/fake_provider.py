@@ -0,0 +1,169 @@
+"""Локальная замена Events Provider API для нагрузочных прогонов синхронизации.
+
+Отдаёт N синтетических событий на M площадках с пагинацией по changed_at,
+места, регистрацию и её отмену. Задержка и доля ошибок 503 настраиваются.
+
+Запуск отдельным процессом:
+
+    python -m app.benchmarks.fake_provider --events 50000 --places 500 --port 8081
+"""
+
+import argparse
+import asyncio
+import bisect
+import random
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from app.benchmarks.synthetic import make_events
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class FakeEventsProvider:
+    """Состояние фейкового провайдера: каталог событий и счётчики запросов"""
+
+    def __init__(
+        self,
+        events: List[Dict[str, Any]],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.events = sorted(events, key=lambda event: event["changed_at"])
+        self.by_id = {event["id"]: event for event in self.events}
+        self._changed_at = [
+            datetime.fromisoformat(event["changed_at"]) for event in self.events
+        ]
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rnd = random.Random(seed)
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._chaos])
+        app.router.add_get("/", self.index)
+        app.router.add_get("/api/events/", self.list_events)
+        app.router.add_get("/api/events/{event_id}/", self.get_event)
+        app.router.add_get("/api/events/{event_id}/seats/", self.get_seats)
+        app.router.add_post("/api/events/{event_id}/register/", self.register)
+        app.router.add_delete("/api/events/{event_id}/unregister/", self.unregister)
+        return app
+
+    @web.middleware
+    async def _chaos(self, request: web.Request, handler):
+        """Задержка и случайные 503 перед каждым ответом"""
+        self.requests += 1
+        if self.latency:
+            # экспоненциальный хвост вокруг заданного среднего
+            await asyncio.sleep(self._rnd.expovariate(1 / self.latency))
+        if self.error_rate and self._rnd.random() < self.error_rate:
+            self.errors += 1
+            raise web.HTTPServiceUnavailable()
+        return await handler(request)
+
+    async def index(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def list_events(self, request: web.Request) -> web.Response:
+        changed_at = datetime.fromisoformat(
+            request.query.get("changed_at", "2000-01-01")
+        )
+        if changed_at.tzinfo is None:
+            changed_at = changed_at.replace(tzinfo=self._changed_at[0].tzinfo)
+        page = int(request.query.get("page", 1))
+        page_size = int(request.query.get("page_size", self.page_size))
+
+        first = bisect.bisect_left(self._changed_at, changed_at)
+        start = first + (page - 1) * page_size
+        results = self.events[start : start + page_size]
+
+        next_url: Optional[str] = None
+        if start + page_size < len(self.events):
+            next_url = str(
+                request.url.with_query(
+                    changed_at=request.query.get("changed_at", "2000-01-01"),
+                    page=page + 1,
+                    page_size=page_size,
+                )
+            )
+        previous_url = None
+        if page > 1:
+            previous_url = str(request.url.update_query(page=page - 1))
+        return web.json_response(
+            {
+                "count": len(self.events) - first,
+                "next": next_url,
+                "previous": previous_url,
+                "results": results,
+            }
+        )
+
+    async def get_event(self, request: web.Request) -> web.Response:
+        return web.json_response(self._event(request))
+
+    async def get_seats(self, request: web.Request) -> web.Response:
+        event = self._event(request)
+        return web.json_response({"seats": _expand(event["place"]["seats_pattern"])})
+
+    async def register(self, request: web.Request) -> web.Response:
+        self._event(request)
+        return web.json_response({"ticket_id": str(uuid.uuid4())}, status=201)
+
+    async def unregister(self, request: web.Request) -> web.Response:
+        self._event(request)
+        return web.json_response({"success": True})
+
+    def _event(self, request: web.Request) -> Dict[str, Any]:
+        event = self.by_id.get(request.match_info["event_id"])
+        if event is None:
+            raise web.HTTPNotFound()
+        return event
+
+
+def _expand(seats_pattern: str) -> List[str]:
+    """'A1-3,B1-2' -> ['A1', 'A2', 'A3', 'B1', 'B2']"""
+    seats = []
+    for part in seats_pattern.split(","):
+        row, first, last = part[0], *part[1:].split("-")
+        seats.extend(f"{row}{number}" for number in range(int(first), int(last) + 1))
+    return seats
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--places", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--latency", type=float, default=0.0, help="средняя, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля 503")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def from_arguments(args: argparse.Namespace) -> FakeEventsProvider:
+    return FakeEventsProvider(
+        make_events(args.events, places_count=args.places, seed=args.seed),
+        page_size=args.page_size,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    web.run_app(from_arguments(args).create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Пропускная способность синхронизации против локального фейкового провайдера.
+
+Поднимает FakeEventsProvider в этом же процессе (или берёт уже запущенный
+через --provider-url) и прогоняет SyncEventsUsecase с начала каталога.
+Пишет в БД из настроек приложения - запускайте на отдельной базе:
+
+    python -m app.benchmarks.sync_throughput --events 50000 --places 500 \\
+        --page-size 200 --latency 0.02
+
+Пиковый RSS - на весь процесс: при встроенном провайдере в него входит и
+его каталог, для чистого замера поднимите провайдер отдельно.
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+from collections import Counter
+
+from aiohttp import web
+from sqlalchemy import event
+
+from app.benchmarks.fake_provider import add_arguments, from_arguments
+from app.database import AsyncSessionLocal, async_engine
+from app.dependencies import (
+    get_event_repo,
+    get_place_repo,
+    get_sync_repo,
+    get_sync_run_repo,
+)
+from app.provider.client import EventsProviderClient
+from app.sync.usecase import SyncEventsUsecase
+
+
+def count_statements(statements: Counter) -> None:
+    """Считает SQL-запросы движка по первому слову"""
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements[statement.lstrip().split(None, 1)[0].upper()] += 1
+
+
+async def run_sync(base_url: str, reconcile: bool) -> SyncEventsUsecase:
+    client = EventsProviderClient(api_key="benchmark", base_url=base_url)
+    async with AsyncSessionLocal() as session:
+        sync_repo = await get_sync_repo(session)
+        locked, _ = await sync_repo.acquire_lock()
+        if not locked:
+            raise RuntimeError("Синхронизация уже выполняется, замер невозможен")
+        usecase = SyncEventsUsecase(
+            client,
+            await get_place_repo(session),
+            await get_event_repo(session),
+            sync_repo,
+            await get_sync_run_repo(session),
+        )
+        try:
+            await usecase.execute(forced_changed_at="2000-01-01", reconcile=reconcile)
+        finally:
+            await client.close()
+    return usecase
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument("--provider-url", help="уже запущенный провайдер")
+    parser.add_argument("--reconcile", action="store_true", help="полная сверка")
+    args = parser.parse_args()
+
+    runner = None
+    base_url = args.provider_url
+    if base_url is None:
+        runner = web.AppRunner(from_arguments(args).create_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        base_url = f"http://{host}:{port}"
+
+    statements: Counter = Counter()
+    count_statements(statements)
+    try:
+        started = time.perf_counter()
+        usecase = await run_sync(base_url, args.reconcile)
+        elapsed = time.perf_counter() - started
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+    pages = usecase._pages_written
+    rows = sum(usecase._rows[key] for key in ("inserted", "updated", "skipped"))
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"время:        {elapsed:.2f} с")
+    print(f"страниц:      {pages} ({pages / elapsed:,.1f} стр/с)")
+    print(f"событий:      {rows} ({rows / elapsed:,.0f} соб/с)")
+    print(f"  вставлено:  {usecase._rows['inserted']}")
+    print(f"  обновлено:  {usecase._rows['updated']}")
+    print(f"  пропущено:  {usecase._rows['skipped']}")
+    print(f"пиковый RSS:  {peak_rss_mb:,.1f} МБ")
+    print(f"SQL-запросов: {sum(statements.values())} {dict(statements)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
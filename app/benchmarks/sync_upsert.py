@@ -0,0 +1,106 @@
+"""Сравнение скорости записи синхронизации: построчный путь против пакетного upsert.
+
+Запуск (нужна БД из настроек приложения, все изменения откатываются):
+
+    python -m app.benchmarks.sync_upsert --events 20000 --places 200 --page-size 100
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.aggregator.events.models import Event
+from app.aggregator.events.repository import EVENT_UPDATE_COLUMNS, EventRepository
+from app.aggregator.places.models import Place
+from app.aggregator.places.repository import PLACE_UPDATE_COLUMNS, PlaceRepository
+from app.benchmarks.synthetic import make_events
+from app.database import AsyncSessionLocal
+from app.provider.paginator import EventsPage
+from app.provider.records import EventRecord
+from app.sync.usecase import SyncEventsUsecase
+
+Page = List[Dict[str, Any]]
+
+
+async def legacy_write(
+    place_repo: PlaceRepository, event_repo: EventRepository, page: Page
+) -> None:
+    """Прежний путь: get + flush площадки и события на каждое событие"""
+    for event_data in page:
+        record = EventRecord.from_payload(event_data)
+        place_row = SyncEventsUsecase._place_row(record.place)
+        place = await place_repo.get(place_row["id"])
+        if place is None:
+            place = Place(**place_row)
+        else:
+            for column in PLACE_UPDATE_COLUMNS:
+                setattr(place, column, place_row[column])
+        await place_repo.save(place)
+
+        event_row = SyncEventsUsecase._event_row(record)
+        event = await event_repo.get(event_row["id"])
+        if event is None:
+            event = Event(**event_row)
+        else:
+            for column in EVENT_UPDATE_COLUMNS:
+                setattr(event, column, event_row[column])
+        await event_repo.save(event)
+
+
+async def bulk_write(usecase: SyncEventsUsecase, page: Page) -> None:
+    """Новый путь: один upsert площадок и один upsert событий на страницу"""
+    records = [EventRecord.from_payload(event) for event in page]
+    await usecase._write_batch(usecase._decode_page(EventsPage(records, None)))
+
+
+async def measure(
+    name: str,
+    pages: List[Page],
+    write: Callable[[PlaceRepository, EventRepository, Page], Awaitable[None]],
+) -> float:
+    """Прогоняет страницы через write в отдельной транзакции и откатывает её"""
+    rows = sum(len(page) for page in pages)
+    async with AsyncSessionLocal() as session:
+        place_repo = PlaceRepository(session)
+        event_repo = EventRepository(session)
+        try:
+            started = time.perf_counter()
+            for page in pages:
+                await write(place_repo, event_repo, page)
+            elapsed = time.perf_counter() - started
+        finally:
+            await session.rollback()
+
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"{name:<8} {rows} событий за {elapsed:.2f} с: {rate:,.0f} строк/с")
+    return rate
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--places", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    events = make_events(args.events, places_count=args.places)
+    pages = [
+        events[start : start + args.page_size]
+        for start in range(0, len(events), args.page_size)
+    ]
+
+    before = await measure("legacy", pages, legacy_write)
+    after = await measure(
+        "bulk",
+        pages,
+        lambda place_repo, event_repo, page: bulk_write(
+            SyncEventsUsecase(None, place_repo, event_repo, None, None), page
+        ),
+    )
+    if before:
+        print(f"ускорение: x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_places(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Генерирует площадки в формате Events Provider API"""
+    rnd = random.Random(seed)
+    places = []
+    for i in range(count):
+        created_at = BASE_TIME - timedelta(days=rnd.randint(30, 365))
+        places.append(
+            {
+                "id": str(uuid.UUID(int=rnd.getrandbits(128), version=4)),
+                "name": f"Площадка {i}",
+                "city": rnd.choice(["Москва", "Казань", "Пермь", "Томск"]),
+                "address": f"ул. Тестовая, д. {i}",
+                "seats_pattern": "A1-1000,B1-2000",
+                "changed_at": created_at.isoformat(),
+                "created_at": created_at.isoformat(),
+            }
+        )
+    return places
+
+
+def make_events(
+    count: int, places_count: int = 100, seed: int = 0
+) -> List[Dict[str, Any]]:
+    """Генерирует события в формате Events Provider API, упорядоченные по changed_at"""
+    rnd = random.Random(seed)
+    places = make_places(places_count, seed=seed)
+    events = []
+    for i in range(count):
+        changed_at = BASE_TIME + timedelta(seconds=i)
+        event_time = BASE_TIME + timedelta(days=rnd.randint(1, 180))
+        events.append(
+            {
+                "id": str(uuid.UUID(int=rnd.getrandbits(128), version=4)),
+                "name": f"Событие {i}",
+                "place": rnd.choice(places),
+                "event_time": event_time.isoformat(),
+                "registration_deadline": (event_time - timedelta(days=1)).isoformat(),
+                "status": "published",
+                "number_of_visitors": rnd.randint(0, 500),
+                "changed_at": changed_at.isoformat(),
+                "created_at": changed_at.isoformat(),
+                "status_changed_at": changed_at.isoformat(),
+            }
+        )
+    return events
@@ -18,6 +18,34 @@ class Settings(BaseSettings):
 
     POSTGRES_CONNECTION_STRING: Optional[str] = None
 
+    PROVIDER_POOL_SIZE: int = 100
+    PROVIDER_POOL_PER_HOST: int = 50
+    PROVIDER_KEEPALIVE_SECONDS: float = 30.0
+    PROVIDER_DNS_CACHE_SECONDS: int = 300
+    PROVIDER_TIMEOUT_TOTAL: float = 10.0
+    PROVIDER_TIMEOUT_CONNECT: float = 5.0
+    PROVIDER_STREAM_READ_TIMEOUT: float = 10.0
+
+    PROVIDER_BREAKER_WINDOW: int = 20
+    PROVIDER_BREAKER_MIN_CALLS: int = 10
+    PROVIDER_BREAKER_FAILURE_RATE: float = 0.5
+    PROVIDER_BREAKER_OPEN_SECONDS: float = 30.0
+    PROVIDER_BREAKER_HALF_OPEN_PROBES: int = 1
+
+    PROVIDER_HTTP_CACHE_SIZE: int = 1024
+
+    PROVIDER_LIMIT_INITIAL: int = 20
+    PROVIDER_LIMIT_MIN: int = 1
+    PROVIDER_LIMIT_MAX: int = 50
+    PROVIDER_LIMIT_BACKOFF: float = 0.5
+    PROVIDER_RETRY_AFTER_MAX: float = 30.0
+
+    PROVIDER_HEDGING_ENABLED: bool = False
+    PROVIDER_HEDGE_PERCENTILE: float = 0.95
+    PROVIDER_HEDGE_MIN_DELAY: float = 0.02
+    PROVIDER_HEDGE_MIN_SAMPLES: int = 20
+    PROVIDER_HEDGE_MAX_EXTRA_RATIO: float = 0.1
+
     MAX_RETRIES: int = 3
     BACKOFF_FACTOR: float = 0.5
 
@@ -28,6 +56,30 @@ class Settings(BaseSettings):
     DAYS_TO_KEEP: int = 7
     TTL_DAYS_IDM_KEYS: int = 7
 
+    SYNC_INTERVAL_SECONDS: int = 300
+    SYNC_INTERVAL_JITTER_SECONDS: int = 30
+    SYNC_LOCK_LEASE_SECONDS: int = 120
+    SYNC_PREFETCH_PAGES: int = 2
+    SYNC_STREAM_PAGES: bool = False
+    SYNC_STREAM_CHUNK_EVENTS: int = 100
+    SYNC_QUEUE_SIZE: int = 4
+    SYNC_BATCH_SIZE: int = 500
+    SYNC_FLUSH_INTERVAL: float = 1.0
+    SYNC_COMMIT_EVERY_PAGES: int = 20
+    SYNC_RECONCILE_DAY_OF_WEEK: str = "sun"
+    SYNC_RECONCILE_HOUR: int = 3
+    SYNC_REMOVE_BATCH_SIZE: int = 1000
+    EVENT_STALENESS_SECONDS: int = 60
+
+    SEATS_CACHE_SIZE: int = 10000
+    SEATS_CACHE_TTL_SECONDS: float = 30.0
+    SEATS_CACHE_STALE_SECONDS: float = 30.0
+    SEATS_SHARED_CACHE_ENABLED: bool = False
+    SEATS_SHARED_CACHE_TTL_SECONDS: float = 30.0
+    SEATS_SHARED_CACHE_L1_SECONDS: float = 2.0
+    # Доля записей в общий кэш, после которых чистятся устаревшие строки
+    SEATS_SHARED_CACHE_PRUNE_PROBABILITY: float = 0.01
+
     model_config = SettingsConfigDict(
         env_file_encoding="utf-8",
         extra="ignore",
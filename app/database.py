@@ -7,6 +7,10 @@ from app.config import settings
 
 DATABASE_URL = settings.POSTGRES_CONNECTION_STRING
 
+# asyncpg ограничивает запрос 32767 параметрами, поэтому крупные пачки
+# в bulk upsert режем на куски
+UPSERT_CHUNK_SIZE = 1000
+
 async_engine = create_async_engine(
     DATABASE_URL,
     pool_size=10,
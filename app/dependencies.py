@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,15 +11,38 @@ from app.aggregator.tickets.repository import TicketRepository
 from app.config import settings
 from app.database import get_async_db
 from app.provider.client import EventsProviderClient
-from app.sync.repository import SyncMetadataRepository
+from app.sync.repository import SyncMetadataRepository, SyncRunRepository
+
+# Один клиент на приложение: создаётся в lifespan и делит пул соединений
+# между роутами, синхронизацией и health-check
+_provider_client: Optional[EventsProviderClient] = None
 
 
-def get_provider_client():
-    """Фабрика для создания клиента Events Provider API"""
-    client = EventsProviderClient(
+def init_provider_client() -> EventsProviderClient:
+    """Создание общего клиента Events Provider API"""
+    global _provider_client
+    _provider_client = EventsProviderClient(
         api_key=settings.LMS_API_KEY, base_url=settings.BASE_URL
     )
-    return client
+    return _provider_client
+
+
+async def close_provider_client() -> None:
+    """Закрытие общего клиента и его пула соединений"""
+    global _provider_client
+    if _provider_client is not None:
+        await _provider_client.close()
+        _provider_client = None
+
+
+def get_provider_client() -> EventsProviderClient:
+    """Общий клиент Events Provider API.
+
+    Вне приложения (скрипты, бенчмарки) создаётся при первом обращении.
+    """
+    if _provider_client is None:
+        return init_provider_client()
+    return _provider_client
 
 
 async def get_place_repo(
@@ -38,6 +63,12 @@ async def get_sync_repo(
     return SyncMetadataRepository(session)
 
 
+async def get_sync_run_repo(
+    session: AsyncSession = Depends(get_async_db),
+) -> SyncRunRepository:
+    return SyncRunRepository(session)
+
+
 async def get_ticket_repo(
     session: AsyncSession = Depends(get_async_db),
 ) -> TicketRepository:
@@ -2,6 +2,7 @@ from typing import Any, Dict
 
 from fastapi import APIRouter, Depends
 
+from app.aggregator.events.seats_service import seats_cache_stats
 from app.dependencies import get_provider_client
 
 router = APIRouter(
@@ -12,5 +13,30 @@ router = APIRouter(
 
 @router.get("")
 async def health_check(client=Depends(get_provider_client)) -> Dict[str, Any]:
-    async with client:
-        return await client.check_availability()
+    result = await client.check_availability()
+    result["provider_circuit"] = client.breaker.snapshot()
+    result["provider_limiter"] = client.limiter.snapshot()
+    if client.hedger is not None:
+        result["provider_hedging"] = client.hedger.snapshot()
+    return result
+
+
+@router.get("/provider")
+async def provider_diagnostics(
+    client=Depends(get_provider_client),
+) -> Dict[str, Any]:
+    """Диагностика клиента провайдера: задержки и статусы по операциям,
+    повторы, автомат, ограничитель, условный кэш и страховочные запросы"""
+    diagnostics: Dict[str, Any] = {
+        "circuit": client.breaker.snapshot(),
+        "limiter": client.limiter.snapshot(),
+        "http_cache": client.http_cache.snapshot(),
+        "seats_cache": seats_cache_stats(),
+    }
+    if client.hedger is not None:
+        diagnostics["hedging"] = client.hedger.snapshot()
+    # сторонний хук метрик может не хранить их в процессе
+    snapshot = getattr(client.metrics, "snapshot", None)
+    if snapshot is not None:
+        diagnostics["operations"] = snapshot()
+    return diagnostics
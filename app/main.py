@@ -9,6 +9,7 @@ from app.aggregator.events.router import router as event_router
 from app.aggregator.tickets.outbox.worker import OutboxWorker
 from app.aggregator.tickets.router import router as router_tickets
 from app.config import settings
+from app.dependencies import close_provider_client, init_provider_client
 from app.health.router import router as router_health
 from app.logger import logger
 from app.notifications.capashino_client import CapashinoClient
@@ -19,6 +20,7 @@ from app.sync.scheduler import shutdown_scheduler, start_scheduler
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🔥 Приложение запускается...")
+    init_provider_client()
     start_scheduler()
     capashino_client = CapashinoClient(
         api_key=settings.LMS_API_KEY, base_url=settings.CAPASHINO_BASE_URL
@@ -39,6 +41,7 @@ async def lifespan(app: FastAPI):
     await worker.stop()
     task.cancel()
     await capashino_client.close()
+    await close_provider_client()
 
 
 app = FastAPI(lifespan=lifespan)
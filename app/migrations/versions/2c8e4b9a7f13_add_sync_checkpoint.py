@@ -0,0 +1,35 @@
+"""add sync checkpoint to sync_metadata
+
+Revision ID: 2c8e4b9a7f13
+Revises: 9d3a6e1f4b27
+Create Date: 2026-03-04 18:05:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2c8e4b9a7f13"
+down_revision: Union[str, Sequence[str], None] = "9d3a6e1f4b27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Чекпоинт синхронизации для продолжения прерванного прогона."""
+    op.add_column(
+        "sync_metadata",
+        sa.Column("checkpoint_changed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "sync_metadata",
+        sa.Column("checkpoint_event_id", sa.String(length=36), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sync_metadata", "checkpoint_event_id")
+    op.drop_column("sync_metadata", "checkpoint_changed_at")
@@ -0,0 +1,33 @@
+"""add content_hash to events and places
+
+Revision ID: 5b1f0c7d2e94
+Revises: 8ee1b5a055c8
+Create Date: 2026-03-02 12:10:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1f0c7d2e94"
+down_revision: Union[str, Sequence[str], None] = "8ee1b5a055c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Отпечаток содержимого строк для пропуска холостых обновлений при sync."""
+    op.add_column(
+        "places", sa.Column("content_hash", sa.String(length=32), nullable=True)
+    )
+    op.add_column(
+        "events", sa.Column("content_hash", sa.String(length=32), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("events", "content_hash")
+    op.drop_column("places", "content_hash")
@@ -0,0 +1,34 @@
+"""add sync lock lease
+
+Revision ID: 6f9b2a4c8d13
+Revises: 4a7c1e9d3b58
+Create Date: 2026-03-09 10:05:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6f9b2a4c8d13"
+down_revision: Union[str, Sequence[str], None] = "4a7c1e9d3b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Владелец и срок аренды блокировки синхронизации."""
+    op.add_column(
+        "sync_metadata", sa.Column("lock_owner", sa.String(length=128), nullable=True)
+    )
+    op.add_column(
+        "sync_metadata",
+        sa.Column("lock_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sync_metadata", "lock_expires_at")
+    op.drop_column("sync_metadata", "lock_owner")
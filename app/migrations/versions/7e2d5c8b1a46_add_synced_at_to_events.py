@@ -0,0 +1,35 @@
+"""add synced_at to events
+
+Revision ID: 7e2d5c8b1a46
+Revises: 2c8e4b9a7f13
+Create Date: 2026-03-06 11:20:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e2d5c8b1a46"
+down_revision: Union[str, Sequence[str], None] = "2c8e4b9a7f13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Время последней сверки события с провайдером."""
+    op.add_column(
+        "events",
+        sa.Column(
+            "synced_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("events", "synced_at")
@@ -0,0 +1,30 @@
+"""add last_event_id to sync_metadata
+
+Revision ID: 9d3a6e1f4b27
+Revises: 5b1f0c7d2e94
+Create Date: 2026-03-03 10:40:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d3a6e1f4b27"
+down_revision: Union[str, Sequence[str], None] = "5b1f0c7d2e94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """id последнего события курсора - разрешает совпадения changed_at."""
+    op.add_column(
+        "sync_metadata",
+        sa.Column("last_event_id", sa.String(length=36), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sync_metadata", "last_event_id")
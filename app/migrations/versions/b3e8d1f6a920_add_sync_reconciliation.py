@@ -0,0 +1,49 @@
+"""add sync reconciliation
+
+Revision ID: b3e8d1f6a920
+Revises: 6f9b2a4c8d13
+Create Date: 2026-03-11 09:40:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8d1f6a920"
+down_revision: Union[str, Sequence[str], None] = "6f9b2a4c8d13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Полная сверка каталога: пометка пропавших событий и промежуточные id."""
+    op.add_column(
+        "events", sa.Column("removed_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column(
+        "sync_runs",
+        sa.Column(
+            "mode", sa.String(length=20), server_default="incremental", nullable=False
+        ),
+    )
+    op.add_column(
+        "sync_runs",
+        sa.Column("rows_removed", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "sync_seen_events",
+        sa.Column("run_id", sa.BigInteger(), nullable=False),
+        sa.Column("event_id", sa.UUID(), nullable=False),
+        sa.PrimaryKeyConstraint("run_id", "event_id"),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sync_seen_events")
+    op.drop_column("sync_runs", "rows_removed")
+    op.drop_column("sync_runs", "mode")
+    op.drop_column("events", "removed_at")
@@ -0,0 +1,44 @@
+"""add shared seats cache
+
+Revision ID: d41c7a2e5f07
+Revises: b3e8d1f6a920
+Create Date: 2026-03-18 11:20:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d41c7a2e5f07"
+down_revision: Union[str, Sequence[str], None] = "b3e8d1f6a920"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Общий для воркеров кэш свободных мест."""
+    op.create_table(
+        "seats_cache",
+        sa.Column("event_id", sa.UUID(), nullable=False),
+        sa.Column("seats", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("event_id"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(
+        op.f("ix_seats_cache_fetched_at"), "seats_cache", ["fetched_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_seats_cache_fetched_at"), table_name="seats_cache")
+    op.drop_table("seats_cache")
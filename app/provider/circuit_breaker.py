@@ -0,0 +1,158 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type
+
+from app.logger import logger
+from app.provider.exceptions import ProviderCircuitOpenError
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Автомат closed/open/half-open вокруг вызовов провайдера.
+
+    closed - вызовы идут, исходы копятся в скользящем окне последних
+    window вызовов; когда в окне не меньше min_calls исходов и доля отказов
+    достигает failure_rate, автомат размыкается.
+    open - вызовы сразу отбиваются ProviderCircuitOpenError, без сети и
+    без повторов; через open_seconds автомат переходит в half-open.
+    half-open - пропускается не больше half_open_probes пробных вызовов:
+    успех замыкает автомат с чистым окном, отказ снова размыкает его.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        failure_types: Tuple[Type[BaseException], ...] = (Exception,),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.failure_types = failure_types
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._outcomes: deque = deque(maxlen=window)
+        self._opened_at: Optional[float] = None
+        self._probes_in_flight = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.open_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info("Автомат провайдера переходит в half-open")
+        return self._state
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Оборачивает один вызов провайдера.
+
+        Исключения из failure_types считаются отказом, прочие (например,
+        4xx - провайдер жив и ответил) и нормальный выход - успехом.
+        """
+        probe = self._before_call()
+        try:
+            yield
+        except Exception as e:
+            if isinstance(e, self.failure_types):
+                self._on_failure(probe)
+            else:
+                self._on_success(probe)
+            raise
+        except BaseException:
+            # отмена вызова ничего не говорит о провайдере
+            if probe:
+                self._probes_in_flight -= 1
+            raise
+        else:
+            self._on_success(probe)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Состояние для health-check"""
+        failures = self._outcomes.count(False)
+        snapshot = {
+            "state": self.state.value,
+            "window_calls": len(self._outcomes),
+            "window_failures": failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+        if self._state is CircuitState.OPEN:
+            snapshot["retry_in_seconds"] = round(
+                max(0.0, self.open_seconds - (self._clock() - self._opened_at)), 1
+            )
+        return snapshot
+
+    def _before_call(self) -> bool:
+        """Пропускает вызов или отбивает его. True - вызов пробный"""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return False
+        if (
+            state is CircuitState.HALF_OPEN
+            and self._probes_in_flight < self.half_open_probes
+        ):
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        raise ProviderCircuitOpenError()
+
+    def _on_success(self, probe: bool) -> None:
+        if probe:
+            self._probes_in_flight -= 1
+            if self._state is CircuitState.HALF_OPEN:
+                self._close()
+            return
+        self._outcomes.append(True)
+
+    def _on_failure(self, probe: bool) -> None:
+        if probe:
+            self._probes_in_flight -= 1
+            if self._state is CircuitState.HALF_OPEN:
+                self._open()
+            return
+        self._outcomes.append(False)
+        if self._state is CircuitState.CLOSED and self._tripped():
+            self._open()
+
+    def _tripped(self) -> bool:
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return False
+        return self._outcomes.count(False) / calls >= self.failure_rate
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self.times_opened += 1
+        logger.warning(
+            "Автомат провайдера разомкнут",
+            extra={
+                "open_seconds": self.open_seconds,
+                "window_failures": self._outcomes.count(False),
+            },
+        )
+
+    def _close(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._opened_at = None
+        logger.info("Автомат провайдера замкнут")
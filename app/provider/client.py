@@ -1,24 +1,95 @@
 import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import requests
-from aiohttp import ClientConnectorError, ClientError, ClientSession, ClientTimeout
+from aiohttp import (
+    ClientConnectorError,
+    ClientError,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    ConnectionTimeoutError,
+    TCPConnector,
+)
 from tenacity import (
+    RetryCallState,
     before_sleep_log,
     retry,
-    retry_if_exception_type,
     stop_after_attempt,
     wait_exponential,
 )
+from yarl import URL
 
 from app.config import settings
 from app.logger import logger
-from app.provider.exceptions import EventsProviderError, ProviderTemporaryError
+from app.provider.circuit_breaker import CircuitBreaker
+from app.provider.exceptions import (
+    EventsProviderError,
+    ProviderPayloadError,
+    ProviderTemporaryError,
+)
+from app.provider.hedging import Hedger
+from app.provider.http_cache import ConditionalCache
+from app.provider.limiter import AdaptiveLimiter, Priority
+from app.provider.metrics import InMemoryProviderMetrics, ProviderMetrics
+from app.provider.streaming import StreamedPage
+
+# Ответ 304, для которого в кэше уже нет тела
+_EVICTED = object()
+
+_backoff = wait_exponential(multiplier=settings.BACKOFF_FACTOR, min=1, max=5)
+
+
+def _wait_retry_after(retry_state: RetryCallState) -> float:
+    """Пауза перед повтором: Retry-After провайдера, иначе экспонента"""
+    error = retry_state.outcome.exception()
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return min(retry_after, settings.PROVIDER_RETRY_AFTER_MAX)
+    return _backoff(retry_state)
+
+
+def _should_retry(retry_state: RetryCallState) -> bool:
+    """Повторять ли попытку.
+
+    Неидемпотентный запрос (idempotent=False) повторяется, только если он
+    точно не выполнен провайдером: иначе, например после таймаута чтения,
+    повтор создал бы второй билет.
+    """
+    if not retry_state.outcome.failed:
+        return False
+    error = retry_state.outcome.exception()
+    if not isinstance(error, EventsProviderClient.ASYNC_RETRY_EXCEPTIONS):
+        return False
+    if retry_state.kwargs.get("idempotent", True):
+        return True
+    return not getattr(error, "maybe_processed", True)
+
+
+_log_retry = before_sleep_log(logger, logging.WARNING)
+
+
+def _before_retry(retry_state: RetryCallState) -> None:
+    """Лог и метрика перед каждым повтором"""
+    _log_retry(retry_state)
+    client = retry_state.args[0]
+    operation = retry_state.kwargs.get("operation", "request")
+    client.metrics.observe_retry(operation, retry_state.outcome.exception())
 
 
 class EventsProviderClient:
-    """Асинхронный HTTP-клиент для Events Provider API"""
+    """Асинхронный HTTP-клиент для Events Provider API
+
+    Рассчитан на один экземпляр на приложение: сессия aiohttp и её пул
+    соединений живут, пока клиент не закрыт, и переиспользуются всеми
+    запросами - без нового TCP+TLS на каждый вызов.
+    """
 
     MAX_RETRIES = settings.MAX_RETRIES
     BACKOFF_FACTOR = settings.BACKOFF_FACTOR
@@ -28,67 +99,325 @@ class EventsProviderClient:
         ConnectionError,
         ProviderTemporaryError,
     )
-    SYNC_RETRY_EXCEPTIONS = (
-        requests.ConnectionError,
-        requests.Timeout,
-        requests.RequestException,
-    )
     RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+    # Ответы, на которые ограничитель сужает параллельность
+    OVERLOAD_STATUSES = {429, 503}
+    # Вызовы, которые ждёт пользователь, обслуживаются раньше синхронизации
+    INTERACTIVE_OPERATIONS = {"get_event", "get_event_seats", "register", "unregister"}
+    STREAM_CHUNK_BYTES = 64 * 1024
 
-    def __init__(self, api_key: str, base_url: str):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        metrics: Optional[ProviderMetrics] = None,
+    ):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.headers = {"x-api-key": api_key}
         self._session: Optional[ClientSession] = None
-
-        self._sync_session = requests.Session()
-        self._sync_session.headers.update(self.headers)
+        # Большая страница читается дольше общего таймаута обычного запроса,
+        # поэтому при потоковом чтении ограничиваем паузы между кусками
+        self.stream_timeout = ClientTimeout(
+            total=None,
+            connect=settings.PROVIDER_TIMEOUT_CONNECT,
+            sock_read=settings.PROVIDER_STREAM_READ_TIMEOUT,
+        )
+        # Объём полученных тел ответов по операциям клиента
+        self.bytes_received: Counter = Counter()
+        # Задержки, статусы и повторы по операциям; хук можно подменить
+        self.metrics = metrics if metrics is not None else InMemoryProviderMetrics()
+        # Отказы - только сеть, таймауты и 5xx/429: на 4xx провайдер жив
+        self.breaker = CircuitBreaker(
+            window=settings.PROVIDER_BREAKER_WINDOW,
+            min_calls=settings.PROVIDER_BREAKER_MIN_CALLS,
+            failure_rate=settings.PROVIDER_BREAKER_FAILURE_RATE,
+            open_seconds=settings.PROVIDER_BREAKER_OPEN_SECONDS,
+            half_open_probes=settings.PROVIDER_BREAKER_HALF_OPEN_PROBES,
+            failure_types=(ProviderTemporaryError,),
+        )
+        self.http_cache = ConditionalCache(settings.PROVIDER_HTTP_CACHE_SIZE)
+        self.limiter = AdaptiveLimiter(
+            initial=settings.PROVIDER_LIMIT_INITIAL,
+            min_limit=settings.PROVIDER_LIMIT_MIN,
+            max_limit=settings.PROVIDER_LIMIT_MAX,
+            backoff=settings.PROVIDER_LIMIT_BACKOFF,
+        )
+        self.hedger: Optional[Hedger] = None
+        if settings.PROVIDER_HEDGING_ENABLED:
+            self.hedger = Hedger(
+                percentile=settings.PROVIDER_HEDGE_PERCENTILE,
+                min_delay=settings.PROVIDER_HEDGE_MIN_DELAY,
+                min_samples=settings.PROVIDER_HEDGE_MIN_SAMPLES,
+                max_extra_ratio=settings.PROVIDER_HEDGE_MAX_EXTRA_RATIO,
+            )
 
     async def _get_session(self) -> ClientSession:
         """Создаёт или возвращает существующую сессию"""
-        if self._session is None:
-            timeout = ClientTimeout(total=10, connect=5)
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=settings.PROVIDER_POOL_SIZE,
+                limit_per_host=settings.PROVIDER_POOL_PER_HOST,
+                keepalive_timeout=settings.PROVIDER_KEEPALIVE_SECONDS,
+                ttl_dns_cache=settings.PROVIDER_DNS_CACHE_SECONDS,
+            )
+            timeout = ClientTimeout(
+                total=settings.PROVIDER_TIMEOUT_TOTAL,
+                connect=settings.PROVIDER_TIMEOUT_CONNECT,
+            )
             self._session = ClientSession(
-                headers=self.headers, raise_for_status=False, timeout=timeout
+                headers=self.headers,
+                raise_for_status=False,
+                timeout=timeout,
+                connector=connector,
             )
         return self._session
 
     @retry(
         stop=stop_after_attempt(MAX_RETRIES),
-        wait=wait_exponential(multiplier=BACKOFF_FACTOR, min=1, max=5),
-        retry=retry_if_exception_type(ASYNC_RETRY_EXCEPTIONS),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
+        wait=_wait_retry_after,
+        retry=_should_retry,
+        before_sleep=_before_retry,
     )
     async def _request(
         self,
         method: str,
         url: str,
+        operation: str = "request",
+        hedge: bool = False,
+        cacheable: bool = True,
+        idempotent: bool = True,
         **kwargs,
     ) -> Dict[str, Any]:
-        """Выполняет HTTP-запрос с повторными попытками"""
+        """Выполняет HTTP-запрос с повторными попытками.
+
+        Каждая попытка проходит через автомат: пока он разомкнут, запрос
+        сразу завершается ProviderCircuitOpenError, который не повторяется.
+
+        GET-запросы условные: для уже виденного URL уходят его валидаторы,
+        и на 304 возвращается закэшированное тело. cacheable=False - ответ
+        не кэшируется (страницы синхронизации почти не перечитываются).
+
+        hedge - попытку можно застраховать вторым запросом (только для
+        идемпотентных GET и только при включённом PROVIDER_HEDGING_ENABLED).
+
+        idempotent=False - повтор только для запроса, который до провайдера
+        точно не дошёл или был им отклонён (429/503).
+        """
         session = await self._get_session()
+        cache_key = None
+        if method == "GET" and cacheable:
+            cache_key = str(URL(url).update_query(kwargs.get("params") or {}))
+
+        with self.breaker.guard():
+            try:
+                if hedge and method == "GET" and self.hedger is not None:
+                    return await self.hedger.run(
+                        operation,
+                        lambda: self._send(
+                            session, method, url, operation, cache_key, **kwargs
+                        ),
+                    )
+                return await self._send(
+                    session, method, url, operation, cache_key, **kwargs
+                )
+            except (ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                message = "Ошибка при обращении к провайдеру"
+                logger.warning(
+                    message, extra={"tries": self.MAX_RETRIES, "error": str(e)}
+                )
+                # соединение не установлено - запрос провайдер не видел
+                raise ProviderTemporaryError(
+                    status=0,
+                    message=message,
+                    maybe_processed=not isinstance(
+                        e, (ClientConnectorError, ConnectionTimeoutError)
+                    ),
+                )
+
+            except EventsProviderError as e:
+                message = "Не известная ошибка при обращении к провайдеру"
+                logger.warning(
+                    message, extra={"tries": self.MAX_RETRIES, "error": str(e)}
+                )
+                raise
+
+    async def _send(
+        self,
+        session: ClientSession,
+        method: str,
+        url: str,
+        operation: str,
+        cache_key: Optional[str],
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Один HTTP-запрос без повторов, в слоте ограничителя"""
+        async with self.limiter.slot(self._priority(operation)):
+            data = await self._attempt(
+                session, method, url, operation, cache_key, True, **kwargs
+            )
+            if data is _EVICTED:
+                # запись кэша пропала между отправкой валидаторов и 304
+                data = await self._attempt(
+                    session, method, url, operation, cache_key, False, **kwargs
+                )
+            if data is _EVICTED:
+                raise ProviderTemporaryError(
+                    status=304, message="304 на безусловный запрос"
+                )
+            return data
+
+    async def _attempt(
+        self,
+        session: ClientSession,
+        method: str,
+        url: str,
+        operation: str,
+        cache_key: Optional[str],
+        validators: bool,
+        **kwargs,
+    ) -> Any:
+        """Запрос и разбор ответа; validators - слать ли валидаторы из кэша.
 
+        Время попытки в метриках - без ожидания слота: только сеть и
+        провайдер.
+        """
+        if cache_key is not None and validators:
+            conditional = self.http_cache.conditional_headers(cache_key)
+            if conditional:
+                kwargs["headers"] = {**kwargs.get("headers", {}), **conditional}
+
+        started = time.perf_counter()
+        status: Optional[int] = 0
+        received = 0
         try:
             async with session.request(method, url, **kwargs) as resp:
+                status = resp.status
+                self._feed_limiter(resp)
+                if resp.status == 304 and cache_key is not None:
+                    cached = self.http_cache.not_modified(cache_key)
+                    return _EVICTED if cached is None else cached.body
                 if resp.status < 300:
-                    return await resp.json()
+                    body = await resp.read()
+                    received = len(body)
+                    self.bytes_received[operation] += received
+                    data = json.loads(body) if body else {}
+                    if cache_key is not None:
+                        self.http_cache.store(cache_key, resp.headers, data)
+                    return data
+                self._raise_for_status(resp)
+        except asyncio.CancelledError:
+            # проигравшая страховка или отмена вызывающим - не исход запроса
+            status = None
+            raise
+        finally:
+            if status is not None:
+                self.metrics.observe_request(
+                    operation, status, time.perf_counter() - started, received
+                )
 
-                if resp.status in self.RETRY_STATUSES or resp.status >= 500:
-                    raise ProviderTemporaryError(status=resp.status)
+    @retry(
+        stop=stop_after_attempt(MAX_RETRIES),
+        wait=_wait_retry_after,
+        retry=_should_retry,
+        before_sleep=_before_retry,
+    )
+    async def _open_stream(
+        self, method: str, url: str, operation: str = "stream", **kwargs
+    ) -> ClientResponse:
+        """Открывает ответ для потокового чтения тела.
 
-                raise EventsProviderError(
-                    status=resp.status, message=f"Provider error: {resp.reason}"
+        Повторы возможны только до получения заголовков: обрыв посреди
+        тела пробрасывается вызывающему как ProviderTemporaryError.
+        При успехе слот ограничителя остаётся занятым, его освобождает
+        вызывающий вместе с ответом.
+        """
+        session = await self._get_session()
+        await self.limiter.acquire(Priority.BACKGROUND)
+        try:
+            with self.breaker.guard():
+                started = time.perf_counter()
+                try:
+                    resp = await session.request(
+                        method, url, timeout=self.stream_timeout, **kwargs
+                    )
+                except (ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    self.metrics.observe_request(
+                        operation, 0, time.perf_counter() - started, 0
+                    )
+                    message = "Ошибка при обращении к провайдеру"
+                    logger.warning(
+                        message, extra={"tries": self.MAX_RETRIES, "error": str(e)}
+                    )
+                    raise ProviderTemporaryError(status=0, message=message)
+
+                # до заголовков; тело досчитывается в _count_chunks
+                self.metrics.observe_request(
+                    operation, resp.status, time.perf_counter() - started, 0
                 )
-        except (ClientError, asyncio.TimeoutError, ConnectionError) as e:
-            message = "Ошибка при обращении к провайдеру"
-            logger.warning(message, extra={"tries": self.MAX_RETRIES, "error": str(e)})
-            raise ProviderTemporaryError(status=0, message=message)
-
-        except EventsProviderError as e:
-            message = "Не известная ошибка при обращении к провайдеру"
-            logger.warning(message, extra={"tries": self.MAX_RETRIES, "error": str(e)})
+                self._feed_limiter(resp)
+                if resp.status < 300:
+                    return resp
+                resp.release()
+                self._raise_for_status(resp)
+        except BaseException:
+            self.limiter.release()
             raise
 
+    def _priority(self, operation: str) -> Priority:
+        if operation in self.INTERACTIVE_OPERATIONS:
+            return Priority.INTERACTIVE
+        return Priority.BACKGROUND
+
+    def _feed_limiter(self, resp: ClientResponse) -> None:
+        """Обратная связь ограничителю по статусу ответа"""
+        if resp.status in self.OVERLOAD_STATUSES:
+            self.limiter.on_overload(self._retry_after(resp))
+        elif resp.status < 500:
+            self.limiter.on_success()
+
+    @staticmethod
+    def _retry_after(resp: ClientResponse) -> Optional[float]:
+        """Retry-After в секундах: число секунд или HTTP-дата"""
+        value = resp.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+    def _raise_for_status(self, resp: ClientResponse) -> None:
+        if resp.status in self.RETRY_STATUSES or resp.status >= 500:
+            retry_after = None
+            if resp.status in self.OVERLOAD_STATUSES:
+                retry_after = self._retry_after(resp)
+            # на 429/503 провайдер отказал, не выполняя запрос
+            raise ProviderTemporaryError(
+                status=resp.status,
+                retry_after=retry_after,
+                maybe_processed=resp.status not in self.OVERLOAD_STATUSES,
+            )
+
+        raise EventsProviderError(
+            status=resp.status, message=f"Provider error: {resp.reason}"
+        )
+
+    async def _count_chunks(
+        self, resp: ClientResponse, operation: str
+    ) -> AsyncIterator[bytes]:
+        async for chunk in resp.content.iter_chunked(self.STREAM_CHUNK_BYTES):
+            self.bytes_received[operation] += len(chunk)
+            self.metrics.observe_bytes(operation, len(chunk))
+            yield chunk
+
     async def check_availability(self):
         """Проверка доступности API"""
         session = await self._get_session()
@@ -108,26 +437,58 @@ class EventsProviderClient:
         params = {"changed_at": changed_at}
         if not url:
             url = f"{self.base_url}/api/events/"
-        return await self._request("GET", url, params=params)
+        return await self._request(
+            "GET", url, operation="get_events_page", cacheable=False, params=params
+        )
+
+    @asynccontextmanager
+    async def stream_events_page(
+        self, changed_at: str = "2000-01-01", url: Optional[str] = None
+    ) -> AsyncIterator[StreamedPage]:
+        """Страница событий с потоковым разбором тела.
+
+        События читаются из ответа по мере разбора, соединение держится
+        открытым до выхода из контекста.
+        """
+        params = {"changed_at": changed_at}
+        if not url:
+            url = f"{self.base_url}/api/events/"
+        resp = await self._open_stream(
+            "GET", url, operation="get_events_page", params=params
+        )
+        try:
+            yield StreamedPage(self._count_chunks(resp, "get_events_page"))
+        except (ClientError, asyncio.TimeoutError) as e:
+            message = "Обрыв ответа провайдера при чтении страницы"
+            logger.warning(message, extra={"error": str(e)})
+            raise ProviderTemporaryError(status=0, message=message) from e
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            message = "Некорректное тело страницы провайдера"
+            logger.warning(message, extra={"error": str(e)})
+            raise ProviderPayloadError(message) from e
+        finally:
+            resp.release()
+            self.limiter.release()
+
+    async def get_event(self, event_id: str) -> Dict[str, Any]:
+        """Получить одно событие по его id"""
+        url = f"{self.base_url}/api/events/{event_id}/"
+        return await self._request("GET", url, operation="get_event", hedge=True)
 
     async def get_event_seats(self, event_id: str) -> List[str]:
         """Получить список свободных мест для события"""
         url = f"{self.base_url}/api/events/{event_id}/seats/"
-        data = await self._request("GET", url)
+        data = await self._request("GET", url, operation="get_event_seats", hedge=True)
         return data.get("seats", [])
 
-    @retry(
-        stop=stop_after_attempt(MAX_RETRIES),
-        wait=wait_exponential(multiplier=BACKOFF_FACTOR, min=1, max=5),
-        retry=retry_if_exception_type(SYNC_RETRY_EXCEPTIONS),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-    )
-    def register(
+    async def register(
         self, event_id: str, first_name: str, last_name: str, email: str, seat: str
     ) -> Dict[str, str]:
-        """Синхронная регистрация участника с повторными попытками"""
-        url = f"{self.base_url}/api/events/{event_id}/register/"
+        """Асинхронная регистрация участника.
 
+        Повторяется, только если провайдер запрос точно не выполнил
+        """
+        url = f"{self.base_url}/api/events/{event_id}/register/"
         payload = {
             "event_id": event_id,
             "first_name": first_name,
@@ -135,28 +496,10 @@ class EventsProviderClient:
             "email": email,
             "seat": seat,
         }
-
-        try:
-            response = self._sync_session.post(url, json=payload)
-            status = response.status_code
-
-            if status < 300:
-                return response.json()
-
-            elif status in self.RETRY_STATUSES or status >= 500:
-                raise ProviderTemporaryError(status=status)
-            else:
-                raise EventsProviderError(
-                    status=status, message=f"Ошибка провайдера: {response.reason}"
-                )
-
-        except (
-            requests.ConnectionError,
-            requests.Timeout,
-            requests.RequestException,
-        ) as e:
-            logger.warning("Ошибка сети при регистрации", extra={"error": str(e)})
-            raise ProviderTemporaryError(status=0, message="Network error") from e
+        # повтор после таймаута ответа мог бы зарегистрировать участника дважды
+        return await self._request(
+            "POST", url, operation="register", idempotent=False, json=payload
+        )
 
     async def unregister(
         self,
@@ -166,27 +509,16 @@ class EventsProviderClient:
         """Асинхронная отмена регистрации"""
         url = f"{self.base_url}/api/events/{event_id}/unregister/"
         payload = {"ticket_id": ticket_id}
-        return await self._request("DELETE", url, json=payload)
+        return await self._request("DELETE", url, operation="unregister", json=payload)
 
     async def close(self):
-        """Синхронное закрытие сессии"""
+        """Асинхронное закрытие сессии"""
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
 
-    def close_sync(self):
-        """Асинхронное закрытие сессии"""
-        self._sync_session.close()
-
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, *args):
         await self.close()
-        self.close_sync()
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        self.close_sync()
@@ -1,3 +1,6 @@
+from typing import Optional
+
+
 class EventsProviderError(Exception):
     """Базовое исключение для ошибок API Events Provider"""
 
@@ -8,9 +11,37 @@ class EventsProviderError(Exception):
 
 
 class ProviderTemporaryError(EventsProviderError):
-    """Исключение для временных ошибок"""
+    """Исключение для временных ошибок
+
+    retry_after - сколько секунд провайдер просил подождать (Retry-After)
+    maybe_processed - запрос мог дойти до провайдера и выполниться; False -
+    точно не выполнен (не удалось соединиться, 429/503), его безопасно
+    повторить даже для неидемпотентного вызова
+    """
 
-    def __init__(self, status: int, message: str = "Временная ошибка"):
+    def __init__(
+        self,
+        status: int,
+        message: str = "Временная ошибка",
+        retry_after: Optional[float] = None,
+        maybe_processed: bool = True,
+    ):
         self.status = status
         self.message = message
+        self.retry_after = retry_after
+        self.maybe_processed = maybe_processed
         super().__init__(self.status, self.message)
+
+
+class ProviderPayloadError(EventsProviderError):
+    """Исключение для ответа провайдера, не прошедшего проверку формата"""
+
+    def __init__(self, message: str):
+        super().__init__(status=502, message=message)
+
+
+class ProviderCircuitOpenError(EventsProviderError):
+    """Исключение для вызова, отбитого разомкнутым автоматом без обращения к сети"""
+
+    def __init__(self, message: str = "Провайдер недоступен, автомат разомкнут"):
+        super().__init__(status=503, message=message)
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyWindow:
+    """Скользящее окно последних задержек для оценки перцентиля"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class Hedger:
+    """Страховочные (hedged) запросы для идемпотентных GET.
+
+    Если первая попытка не ответила за задержку, равную перцентилю
+    percentile недавних ответов этой операции, отправляется вторая, и
+    берётся тот ответ, что пришёл раньше; проигравший отменяется. Пока
+    образцов меньше min_samples, страховки нет. Доля страховочных
+    запросов среди последних budget_window ограничена max_extra_ratio,
+    чтобы при общей деградации провайдера не удваивать на него нагрузку.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_delay: float = 0.02,
+        min_samples: int = 20,
+        max_extra_ratio: float = 0.1,
+        window: int = 200,
+        budget_window: int = 100,
+    ):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_extra_ratio = max_extra_ratio
+        self._window_size = window
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self._recent_hedges: Deque[bool] = deque(maxlen=budget_window)
+
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def delay(self, operation: str) -> Optional[float]:
+        """Через сколько секунд страховать операцию; None - данных пока мало"""
+        latencies = self._latencies.get(operation)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, latencies.percentile(self.percentile))
+
+    async def run(self, operation: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Выполняет call, при задержке страхуя его второй такой же попыткой"""
+        self.requests += 1
+        started = time.monotonic()
+        delay = self.delay(operation)
+        primary = asyncio.ensure_future(call())
+        if delay is not None:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done:
+                if self._budget_allows():
+                    return await self._race(operation, primary, call, started)
+                self.budget_exhausted += 1
+        self._recent_hedges.append(False)
+        try:
+            result = await primary
+        except BaseException:
+            primary.cancel()
+            raise
+        self._record(operation, started)
+        return result
+
+    async def _race(
+        self,
+        operation: str,
+        primary: asyncio.Future,
+        call: Callable[[], Awaitable[T]],
+        started: float,
+    ) -> T:
+        """Первая успешная из двух попыток; ошибка - только если упали обе"""
+        self.hedged += 1
+        self._recent_hedges.append(True)
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        self._record(operation, started)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _budget_allows(self) -> bool:
+        window = self._recent_hedges.maxlen
+        return sum(self._recent_hedges) < self.max_extra_ratio * window
+
+    def _record(self, operation: str, started: float) -> None:
+        latencies = self._latencies.get(operation)
+        if latencies is None:
+            latencies = self._latencies[operation] = LatencyWindow(self._window_size)
+        latencies.add(time.monotonic() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_exhausted": self.budget_exhausted,
+            "delays": {
+                operation: self.delay(operation) for operation in self._latencies
+            },
+        }
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """Разобранное тело ответа и его валидаторы"""
+
+    body: Any
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class ConditionalCache:
+    """Ограниченный LRU-кэш ответов для условных GET-запросов.
+
+    По URL хранит ETag/Last-Modified и уже разобранное тело. Запрос к
+    закэшированному URL уходит с If-None-Match/If-Modified-Since, и на
+    304 вызывающий получает тело из кэша - по сети идут только заголовки.
+    Тело отдаётся как есть, без копии: вызывающие его не изменяют.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Заголовки условного запроса для ранее виденного URL"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def not_modified(self, key: str) -> Optional[CachedResponse]:
+        """Ответ 304: запись из кэша.
+
+        None - запись вытеснили или сбросили, пока шёл условный запрос;
+        тогда тело нужно запросить заново без валидаторов.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key: str, headers: Mapping[str, str], body: Any) -> None:
+        """Запоминает ответ 200, если провайдер прислал валидаторы"""
+        self.misses += 1
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = CachedResponse(body, etag, last_modified)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
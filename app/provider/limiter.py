@@ -0,0 +1,129 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.logger import logger
+
+
+class Priority(IntEnum):
+    """Чем меньше значение, тем раньше вызов получает слот"""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class AdaptiveLimiter:
+    """AIMD-ограничитель одновременных вызовов провайдера.
+
+    Каждый успешный ответ увеличивает лимит примерно на единицу за
+    «поколение» вызовов (limit += 1 / limit), ответ 429/503 умножает его
+    на backoff - не чаще раза в decrease_interval, чтобы одна волна
+    отказов не обнулила лимит. Retry-After приостанавливает выдачу слотов
+    всем вызовам до указанного момента.
+
+    Освободившийся слот отдаётся ожидающему с наивысшим приоритетом,
+    при равном приоритете - первому пришедшему.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 50,
+        backoff: float = 0.5,
+        decrease_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.decrease_interval = decrease_interval
+        self._clock = clock
+
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._paused_until = 0.0
+        self._last_decrease: Optional[float] = None
+        self.throttled = 0
+        self.queued = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: Priority) -> None:
+        """Ждёт паузы Retry-After и свободного слота"""
+        while (pause := self._paused_until - self._clock()) > 0:
+            await asyncio.sleep(pause)
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            return
+
+        self.queued += 1
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # слот уже передали, а вызов отменили - возвращаем его
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_overload(self, retry_after: Optional[float] = None) -> None:
+        """Провайдер ответил 429/503: сужаем окно и выдерживаем Retry-After"""
+        self.throttled += 1
+        now = self._clock()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        if (
+            self._last_decrease is not None
+            and now - self._last_decrease < self.decrease_interval
+        ):
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        logger.warning(
+            "Провайдер перегружен, снижаем параллельность",
+            extra={"limit": self.capacity, "retry_after": retry_after},
+        )
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.capacity:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": sum(not waiter.cancelled() for *_, waiter in self._waiters),
+            "queued": self.queued,
+            "throttled": self.throttled,
+            "paused_seconds": round(max(0.0, self._paused_until - self._clock()), 1),
+        }
@@ -0,0 +1,103 @@
+import bisect
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Sequence
+
+# Верхние границы корзин гистограммы задержек, секунды
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ProviderMetrics:
+    """Хук метрик клиента провайдера.
+
+    Базовая реализация ничего не делает: чтобы отправлять метрики в
+    Prometheus/StatsD, переопределите методы и передайте экземпляр в
+    EventsProviderClient(metrics=...). Методы вызываются синхронно на
+    горячем пути запроса и не должны блокировать.
+    """
+
+    def observe_request(
+        self, operation: str, status: int, seconds: float, received: int
+    ) -> None:
+        """Одна HTTP-попытка: status 0 - ответа не было (сеть, таймаут)"""
+
+    def observe_bytes(self, operation: str, received: int) -> None:
+        """Байты тела, дочитанные потоком после observe_request"""
+
+    def observe_retry(self, operation: str, error: BaseException) -> None:
+        """tenacity решил повторить попытку после error"""
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами; последняя - всё, что выше"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает квантиль q"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class InMemoryProviderMetrics(ProviderMetrics):
+    """Метрики в памяти процесса, отдаются диагностическим эндпоинтом"""
+
+    def __init__(self):
+        self.latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.retries: Dict[str, Counter] = defaultdict(Counter)
+        self.received: Counter = Counter()
+
+    def observe_request(
+        self, operation: str, status: int, seconds: float, received: int
+    ) -> None:
+        self.latency[operation].observe(seconds)
+        self.statuses[operation][status] += 1
+        self.received[operation] += received
+
+    def observe_bytes(self, operation: str, received: int) -> None:
+        self.received[operation] += received
+
+    def observe_retry(self, operation: str, error: BaseException) -> None:
+        self.retries[operation][type(error).__name__] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        operations = sorted(set(self.latency) | set(self.received))
+        return {
+            operation: {
+                "latency_seconds": self.latency[operation].snapshot(),
+                "statuses": {
+                    str(status): count
+                    for status, count in sorted(self.statuses[operation].items())
+                },
+                "retries": dict(self.retries[operation]),
+                "bytes_received": self.received[operation],
+            }
+            for operation in operations
+        }
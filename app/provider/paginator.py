@@ -1,24 +1,66 @@
-from typing import Any, Dict, Optional
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.provider.client import EventsProviderClient
+from app.provider.records import EventRecord
+
+
+@dataclass
+class EventsPage:
+    """Страница событий провайдера и ссылка на следующую за ней"""
+
+    results: List[Any]
+    next_url: Optional[str]
+    # часть страницы при потоковом чтении: next_url известен только у последней
+    partial: bool = False
+
+    def __len__(self) -> int:
+        return len(self.results)
 
 
 class EventsPaginator:
-    """Асинхронный итератор для обхода ВСЕХ событий через пагинацию"""
+    """Асинхронный итератор для обхода ВСЕХ событий через пагинацию
+
+    При prefetch > 0 страницы загружаются фоновой задачей с опережением:
+    пока вызывающий код обрабатывает страницу k, уже качается k+1.
+    В буфере держится не больше prefetch готовых страниц.
+
+    При stream=True тело страницы разбирается потоково, а pages() отдаёт её
+    частями по stream_chunk событий (partial=True у всех, кроме последней).
+    Фоновая подгрузка в этом режиме не используется: она снова держала бы
+    страницы в памяти целиком.
+
+    При typed=True события отдаются как EventRecord: разбор и проверка
+    делаются здесь, один раз на событие.
+    """
 
     def __init__(
         self,
         client: EventsProviderClient,
         changed_at: Optional[str] = None,
+        prefetch: int = 0,
+        stream: bool = False,
+        stream_chunk: int = 100,
+        typed: bool = False,
     ):
         self.client = client
         self.changed_at = changed_at
+        self.prefetch = prefetch
+        self.stream = stream
+        self.stream_chunk = stream_chunk
+        self.typed = typed
 
         self._current_page_events: list = []
+        self._current_page_next: Optional[str] = None
         self._current_index: int = 0
         self._next_url: Optional[str] = None
         self._first_page_loaded: bool = False
 
+        self._buffer: Optional[asyncio.Queue] = None
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._streamed_events: Optional[AsyncIterator[Dict[str, Any]]] = None
+
     def __aiter__(self):
         """Возвращаем сам итератор"""
         return self
@@ -28,28 +70,130 @@ class EventsPaginator:
         Возвращает следующее событие.
         Автоматически загружает следующую страницу, когда текущая закончилась.
         """
+        if self.stream:
+            if self._streamed_events is None:
+                self._streamed_events = self._iter_streamed_events()
+            return await anext(self._streamed_events)
+
         if self._current_index >= len(self._current_page_events):
             await self._load_next_page()
 
             if not self._current_page_events:
-                await self.client.close()
+                await self.aclose()
                 raise StopAsyncIteration
 
         event = self._current_page_events[self._current_index]
         self._current_index += 1
         return event
 
+    async def pages(self) -> AsyncIterator[EventsPage]:
+        """Обход событий постранично: одна итерация - одна страница провайдера"""
+        if self.stream:
+            async for page in self._stream_pages():
+                yield page
+            return
+        try:
+            while True:
+                await self._load_next_page()
+                if not self._current_page_events:
+                    return
+
+                self._current_index = len(self._current_page_events)
+                yield EventsPage(self._current_page_events, self._current_page_next)
+        finally:
+            await self.aclose()
+
+    async def _stream_pages(self) -> AsyncIterator[EventsPage]:
+        """Потоковый обход: страница отдаётся частями по мере разбора ответа"""
+        url: Optional[str] = None
+        first = True
+        while first or url:
+            if url:
+                stream = self.client.stream_events_page(url=url)
+            else:
+                stream = self.client.stream_events_page(changed_at=self.changed_at)
+            first = False
+
+            async with stream as page:
+                chunk: List[Dict[str, Any]] = []
+                total = 0
+                async for event in page:
+                    chunk.append(self._decode(event))
+                    total += 1
+                    if len(chunk) >= self.stream_chunk:
+                        yield EventsPage(chunk, None, partial=True)
+                        chunk = []
+                url = page.fields.get("next")
+
+            if not total:
+                return
+            yield EventsPage(chunk, url)
+
+    def _decode(self, event: Dict[str, Any]) -> Any:
+        return EventRecord.from_payload(event) if self.typed else event
+
+    async def _iter_streamed_events(self) -> AsyncIterator[Dict[str, Any]]:
+        async for page in self._stream_pages():
+            for event in page.results:
+                yield event
+
+    async def aclose(self) -> None:
+        """Останавливает фоновую подгрузку страниц"""
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            self._prefetch_task.cancel()
+            try:
+                await self._prefetch_task
+            except asyncio.CancelledError:
+                pass
+        self._prefetch_task = None
+
     async def _load_next_page(self):
         """Загружает следующую страницу событий"""
+        if self.prefetch > 0:
+            response = await self._next_prefetched()
+        else:
+            response = await self._fetch_page()
+
+        results = response.get("results", []) if response else []
+        if self.typed:
+            results = [self._decode(event) for event in results]
+        self._current_page_events = results
+        self._current_page_next = response.get("next") if response else None
+        self._current_index = 0
+
+    async def _fetch_page(self) -> Optional[Dict[str, Any]]:
+        """Запрашивает у провайдера следующую по ссылке next страницу"""
         if not self._first_page_loaded:
             response = await self.client.get_events_page(changed_at=self.changed_at)
             self._first_page_loaded = True
         else:
             if self._next_url is None:
-                self._current_page_events = []
-                return
+                return None
             response = await self.client.get_events_page(url=self._next_url)
 
-        self._current_page_events = response.get("results", [])
-        self._current_index = 0
         self._next_url = response.get("next")
+        return response
+
+    async def _next_prefetched(self) -> Optional[Dict[str, Any]]:
+        """Забирает готовую страницу из буфера фоновой подгрузки"""
+        if self._buffer is None:
+            self._buffer = asyncio.Queue(maxsize=self.prefetch)
+            self._prefetch_task = asyncio.create_task(self._prefetch_pages())
+
+        item = await self._buffer.get()
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    async def _prefetch_pages(self) -> None:
+        """Фоновая задача: качает страницы, пока буфер не заполнится"""
+        try:
+            while True:
+                response = await self._fetch_page()
+                await self._buffer.put(response)
+                if not response or not response.get("results"):
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._buffer.put(e)
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.provider.exceptions import ProviderPayloadError
+
+
+@dataclass(slots=True, frozen=True)
+class PlaceRecord:
+    """Площадка из ответа провайдера, разобранная и проверенная один раз"""
+
+    id: str
+    name: str
+    city: str
+    address: str
+    seats_pattern: str
+    changed_at: datetime
+    created_at: datetime
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "PlaceRecord":
+        try:
+            return cls(
+                id=str(data["id"]),
+                name=data["name"],
+                city=data["city"],
+                address=data["address"],
+                seats_pattern=data["seats_pattern"],
+                changed_at=datetime.fromisoformat(data["changed_at"]),
+                created_at=datetime.fromisoformat(data["created_at"]),
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ProviderPayloadError(f"Некорректная площадка: {e!r}") from e
+
+    def as_row(self) -> Dict[str, Any]:
+        """Строка для таблицы places"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "city": self.city,
+            "address": self.address,
+            "seats_pattern": self.seats_pattern,
+            "changed_at": self.changed_at,
+            "created_at": self.created_at,
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class EventRecord:
+    """Событие из ответа провайдера, разобранное и проверенное один раз.
+
+    Даты уже разобраны, поля доступны атрибутами - горячий цикл
+    синхронизации не ходит по словарю и не парсит строки повторно.
+    """
+
+    id: str
+    name: str
+    place: PlaceRecord
+    event_time: datetime
+    registration_deadline: datetime
+    status: str
+    number_of_visitors: int
+    changed_at: datetime
+    created_at: datetime
+    status_changed_at: Optional[datetime]
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "EventRecord":
+        try:
+            status_changed_at = data.get("status_changed_at")
+            return cls(
+                id=str(data["id"]),
+                name=data["name"],
+                place=PlaceRecord.from_payload(data["place"]),
+                event_time=datetime.fromisoformat(data["event_time"]),
+                registration_deadline=datetime.fromisoformat(
+                    data["registration_deadline"]
+                ),
+                status=data["status"],
+                number_of_visitors=data["number_of_visitors"],
+                changed_at=datetime.fromisoformat(data["changed_at"]),
+                created_at=datetime.fromisoformat(data["created_at"]),
+                status_changed_at=datetime.fromisoformat(status_changed_at)
+                if status_changed_at
+                else None,
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ProviderPayloadError(f"Некорректное событие: {e!r}") from e
+
+    @property
+    def cursor(self) -> Tuple[datetime, str]:
+        """Позиция события в инкрементальной синхронизации"""
+        return self.changed_at, self.id
+
+    def as_row(self) -> Dict[str, Any]:
+        """Строка для таблицы events"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "place_id": self.place.id,
+            "event_time": self.event_time,
+            "registration_deadline": self.registration_deadline,
+            "status": self.status,
+            "number_of_visitors": self.number_of_visitors,
+            "changed_at": self.changed_at,
+            "created_at": self.created_at,
+            "status_changed_at": self.status_changed_at,
+        }
@@ -0,0 +1,114 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+# Сколько уже разобранного текста держать в буфере до его обрезки
+_COMPACT_THRESHOLD = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class StreamedPage:
+    """Потоковый разбор страницы провайдера вида {..., "results": [...], ...}
+
+    События из массива results отдаются по одному по мере разбора тела, так
+    что в памяти одновременно лежит одно событие и непрочитанный хвост
+    буфера, а не вся страница. Остальные поля верхнего уровня (next,
+    count, ...) собираются в fields; поля после results становятся
+    известны, только когда итерация по событиям закончена.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], results_key: str = "results"):
+        self.fields: Dict[str, Any] = {}
+        self._chunks = chunks
+        self._results_key = results_key
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+        self._consumed = False
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        if self._consumed:
+            raise RuntimeError("Страница уже прочитана")
+        self._consumed = True
+        return self._events()
+
+    async def _events(self) -> AsyncIterator[Dict[str, Any]]:
+        await self._expect("{")
+        while True:
+            char = await self._peek()
+            if char == "}":
+                self._pos += 1
+                return
+            if char == ",":
+                self._pos += 1
+                continue
+
+            key = await self._value()
+            await self._expect(":")
+            if key != self._results_key:
+                self.fields[key] = await self._value()
+                continue
+
+            await self._expect("[")
+            while True:
+                char = await self._peek()
+                if char == "]":
+                    self._pos += 1
+                    break
+                if char == ",":
+                    self._pos += 1
+                    continue
+                yield await self._value()
+
+    async def _value(self) -> Any:
+        """Разбирает одно JSON-значение, дочитывая тело, пока оно не целое"""
+        await self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not await self._read_more():
+                    raise
+                continue
+            # число на границе куска может продолжиться в следующем
+            if end == len(self._buffer) and await self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    async def _peek(self) -> str:
+        """Первый значимый символ после пробелов"""
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not await self._read_more():
+                raise json.JSONDecodeError(
+                    "Неожиданный конец ответа", self._buffer, self._pos
+                )
+
+    async def _expect(self, char: str) -> None:
+        if await self._peek() != char:
+            raise json.JSONDecodeError(f"Ожидался '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    async def _read_more(self) -> bool:
+        """Дочитывает следующий кусок тела. False - тело закончилось"""
+        if self._exhausted:
+            return False
+        chunk: Optional[bytes] = await anext(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            tail = self._utf8.decode(b"", final=True)
+        else:
+            tail = self._utf8.decode(chunk)
+
+        if self._pos > _COMPACT_THRESHOLD:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        self._buffer += tail
+        return True
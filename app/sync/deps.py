@@ -7,9 +7,10 @@ from app.dependencies import (
     get_place_repo,
     get_provider_client,
     get_sync_repo,
+    get_sync_run_repo,
 )
 from app.provider.client import EventsProviderClient
-from app.sync.repository import SyncMetadataRepository
+from app.sync.repository import SyncMetadataRepository, SyncRunRepository
 from app.sync.usecase import SyncEventsUsecase
 
 
@@ -18,5 +19,6 @@ async def get_sync_usecase(
     place_repo: PlaceRepository = Depends(get_place_repo),
     event_repo: EventRepository = Depends(get_event_repo),
     sync_repo: SyncMetadataRepository = Depends(get_sync_repo),
+    run_repo: SyncRunRepository = Depends(get_sync_run_repo),
 ) -> SyncEventsUsecase:
-    return SyncEventsUsecase(client, place_repo, event_repo, sync_repo)
+    return SyncEventsUsecase(client, place_repo, event_repo, sync_repo, run_repo)
@@ -0,0 +1,6 @@
+class SyncLockLost(Exception):
+    """Аренда блокировки синхронизации истекла и перешла к другому владельцу"""
+
+    def __init__(self, owner: str):
+        self.owner = owner
+        super().__init__(f"Блокировка синхронизации потеряна владельцем {owner}")
@@ -0,0 +1,11 @@
+import hashlib
+from typing import Any, Dict, Sequence
+
+
+def content_hash(row: Dict[str, Any], columns: Sequence[str]) -> str:
+    """Отпечаток значений колонок строки: совпал - значит, перезаписывать нечего"""
+    digest = hashlib.blake2b(digest_size=16)
+    for column in columns:
+        digest.update(repr(row[column]).encode())
+        digest.update(b"\x1f")
+    return digest.hexdigest()
@@ -1,7 +1,9 @@
+import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import BigInteger, DateTime, Float, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -23,10 +25,29 @@ class SyncMetadata(Base):
         DateTime(timezone=True), nullable=True
     )
 
+    last_event_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
+    # Чекпоинт незавершённого прогона: курсор последнего коммита, с него
+    # прогон и продолжается
+    checkpoint_changed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    checkpoint_event_id: Mapped[Optional[str]] = mapped_column(
+        String(36), nullable=True
+    )
+
     sync_status: Mapped[str] = mapped_column(
         String(20), nullable=False, default="pending"
     )
 
+    # Аренда блокировки: кто синхронизирует и до какого момента
+    lock_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+
+    lock_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -37,3 +58,65 @@ class SyncMetadata(Base):
 
     def __repr__(self) -> str:
         return f"SyncMetadata(last_sync={self.last_sync_at}, status={self.sync_status})"
+
+
+class SyncRun(Base):
+    """Один прогон синхронизации: длительность, объёмы и где ушло время"""
+
+    __tablename__ = "sync_runs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="in_progress"
+    )
+
+    # incremental - обычный прогон по курсору, reconcile - полная сверка каталога
+    mode: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="incremental", server_default="incremental"
+    )
+
+    pages_fetched: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    rows_inserted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    rows_updated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    rows_skipped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    rows_removed: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
+    bytes_received: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    provider_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+    db_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"SyncRun({self.id}, status={self.status})"
+
+
+class SyncSeenEvent(Base):
+    """Id событий, встреченных полной сверкой, - промежуточная таблица.
+
+    UNLOGGED: содержимое нужно только до конца прогона, WAL на него не тратим.
+    """
+
+    __tablename__ = "sync_seen_events"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    run_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
@@ -0,0 +1,231 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from app.provider.paginator import EventsPage
+
+Row = Dict[str, Any]
+# Курсор синхронизации: (changed_at, id) - id разрешает совпадения времени
+Cursor = Tuple[datetime, str]
+
+_DONE = object()
+
+
+@dataclass
+class SyncBatch:
+    """Строки places/events, готовые к пакетной записи, без дублей по id"""
+
+    places: Dict[str, Row] = field(default_factory=dict)
+    events: Dict[str, Row] = field(default_factory=dict)
+    max_cursor: Optional[Cursor] = None
+    # сколько страниц провайдера вошло в пачку и ссылка next после последней
+    pages: int = 0
+    next_url: Optional[str] = None
+
+    def add(self, place_row: Row, event_row: Row) -> None:
+        """Добавляет событие и его площадку, оставляя самую свежую версию строки"""
+        # ON CONFLICT DO UPDATE не может обновить одну строку дважды за запрос
+        _keep_latest(self.places, place_row)
+        _keep_latest(self.events, event_row)
+        self._touch((event_row["changed_at"], str(event_row["id"])))
+
+    def merge(self, other: "SyncBatch") -> None:
+        """Вливает другую пачку в текущую"""
+        for row in other.places.values():
+            _keep_latest(self.places, row)
+        for row in other.events.values():
+            _keep_latest(self.events, row)
+        if other.max_cursor is not None:
+            self._touch(other.max_cursor)
+        self.pages += other.pages
+        self.next_url = other.next_url
+
+    def _touch(self, cursor: Cursor) -> None:
+        if self.max_cursor is None or cursor > self.max_cursor:
+            self.max_cursor = cursor
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.events and not self.pages
+
+
+def _keep_latest(rows: Dict[str, Row], row: Row) -> None:
+    current = rows.get(row["id"])
+    if current is None or row["changed_at"] >= current["changed_at"]:
+        rows[row["id"]] = row
+
+
+@dataclass
+class StageStats:
+    """Счётчики одной стадии конвейера.
+
+    busy - собственная работа стадии, idle - ожидание входных данных,
+    blocked - ожидание места в выходной очереди (давление со стороны потребителя).
+    """
+
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0
+    idle_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    max_queue_depth: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "idle_seconds": round(self.idle_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": round(self.items / self.busy_seconds, 1)
+            if self.busy_seconds
+            else None,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class SyncPipeline:
+    """Конвейер синхронизации: загрузка -> разбор -> пакетная запись.
+
+    Стадии связаны ограниченными очередями, поэтому медленная запись в БД
+    притормаживает загрузку страниц, а не копит их в памяти.
+    Писатель сбрасывает накопленное, когда набралось batch_size событий
+    или с первой строки в буфере прошло flush_interval секунд.
+    """
+
+    def __init__(
+        self,
+        pages: AsyncIterator[EventsPage],
+        decode: Callable[[EventsPage], SyncBatch],
+        write: Callable[[SyncBatch], Awaitable[None]],
+        queue_size: int = 4,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.pages = pages
+        self.decode = decode
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._raw: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._decoded: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.fetch_stats = StageStats("fetch")
+        self.decode_stats = StageStats("decode")
+        self.write_stats = StageStats("write")
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage.name: stage.as_dict()
+            for stage in (self.fetch_stats, self.decode_stats, self.write_stats)
+        }
+
+    async def run(self) -> None:
+        """Запускает стадии; ошибка любой из них останавливает весь конвейер"""
+        tasks = [
+            asyncio.create_task(self._fetch()),
+            asyncio.create_task(self._decode()),
+            asyncio.create_task(self._write()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _put(self, queue: asyncio.Queue, item: Any, stats: StageStats) -> None:
+        started = time.perf_counter()
+        await queue.put(item)
+        stats.blocked_seconds += time.perf_counter() - started
+        stats.max_queue_depth = max(stats.max_queue_depth, queue.qsize())
+
+    async def _get(self, queue: asyncio.Queue, stats: StageStats) -> Any:
+        started = time.perf_counter()
+        item = await queue.get()
+        stats.idle_seconds += time.perf_counter() - started
+        return item
+
+    async def _fetch(self) -> None:
+        """Стадия загрузки страниц у провайдера"""
+        stats = self.fetch_stats
+        started = time.perf_counter()
+        async for page in self.pages:
+            stats.busy_seconds += time.perf_counter() - started
+            stats.items += 1
+            await self._put(self._raw, page, stats)
+            started = time.perf_counter()
+        stats.busy_seconds += time.perf_counter() - started
+        await self._put(self._raw, _DONE, stats)
+
+    async def _decode(self) -> None:
+        """Стадия разбора страниц в строки для записи"""
+        stats = self.decode_stats
+        while True:
+            page = await self._get(self._raw, stats)
+            if page is _DONE:
+                await self._put(self._decoded, _DONE, stats)
+                return
+
+            started = time.perf_counter()
+            batch = self.decode(page)
+            stats.busy_seconds += time.perf_counter() - started
+            stats.items += len(page)
+            await self._put(self._decoded, batch, stats)
+
+    async def _write(self) -> None:
+        """Стадия пакетной записи в БД"""
+        stats = self.write_stats
+        pending = SyncBatch()
+        deadline: Optional[float] = None
+
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = max(deadline - time.monotonic(), 0)
+
+            started = time.perf_counter()
+            try:
+                batch = await asyncio.wait_for(self._decoded.get(), timeout)
+            except asyncio.TimeoutError:
+                batch = None
+            stats.idle_seconds += time.perf_counter() - started
+
+            if batch is _DONE:
+                await self._flush(pending)
+                return
+
+            if batch is not None:
+                pending.merge(batch)
+                if deadline is None and not pending.is_empty:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if len(pending) >= self.batch_size or (
+                deadline is not None and time.monotonic() >= deadline
+            ):
+                await self._flush(pending)
+                pending = SyncBatch()
+                deadline = None
+
+    async def _flush(self, batch: SyncBatch) -> None:
+        if batch.is_empty:
+            return
+        started = time.perf_counter()
+        await self.write(batch)
+        self.write_stats.busy_seconds += time.perf_counter() - started
+        self.write_stats.items += len(batch)
@@ -1,18 +1,44 @@
-from datetime import datetime
-from typing import Optional
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Sequence
 
-from sqlalchemy import select, update
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.aggregator.events.models import Event
+from app.config import settings
 from app.logger import logger
-from app.sync.models import SyncMetadata
+from app.sync.exceptions import SyncLockLost
+from app.sync.models import SyncMetadata, SyncRun, SyncSeenEvent
+
+# Идентификатор процесса-владельца блокировки: уникален даже для
+# перезапущенного пода с тем же hostname и pid
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# 2 параметра на строку при лимите asyncpg в 32767 параметров
+SEEN_CHUNK_SIZE = 10000
+
+EMPTY_CHECKPOINT = {
+    "checkpoint_changed_at": None,
+    "checkpoint_event_id": None,
+}
 
 
 class SyncMetadataRepository:
-    """Репозиторий для работы с таблицей SyncMetadata"""
+    """Репозиторий для работы с таблицей SyncMetadata
 
-    def __init__(self, session: AsyncSession):
+    Блокировка синхронизации - аренда на SYNC_LOCK_LEASE_SECONDS: владелец
+    продлевает её, пока работает, а упавшего владельца после истечения
+    срока подменяет любая другая реплика. Записи под блокировкой
+    (чекпоинт, снятие) проходят, только пока аренда у этого владельца.
+    """
+
+    def __init__(self, session: AsyncSession, owner: str = INSTANCE_ID):
         self.session = session
+        self.owner = owner
 
     async def get_with_lock(self) -> Optional[SyncMetadata]:
         """Получить запись с блокировкой для обновления"""
@@ -24,51 +50,154 @@ class SyncMetadataRepository:
     async def acquire_lock(self) -> tuple[bool, Optional[datetime]]:
         """
         Попытка захватить блокировку для синхронизации.
-        Возвращает (успех, last_changed_at) или (False, None) если уже выполняется.
+        Возвращает (успех, last_changed_at) или (False, None) если чья-то
+        аренда ещё действует - в том числе другого прогона этого процесса.
         """
         async with self.session.begin():
             meta = await self.get_with_lock()
+            now = await self.session.scalar(select(func.now()))
             if meta and meta.sync_status == "in_progress":
-                return False, None
+                if meta.lock_expires_at is not None and meta.lock_expires_at > now:
+                    return False, None
+                logger.warning(
+                    "Аренда блокировки истекла, перехватываем синхронизацию",
+                    extra={
+                        "previous_owner": meta.lock_owner,
+                        "expired_at": str(meta.lock_expires_at),
+                    },
+                )
 
             last_changed_at = None
             if meta and meta.last_changed_at:
                 last_changed_at = meta.last_changed_at
 
+            lease = dict(
+                sync_status="in_progress",
+                last_sync_at=now,
+                lock_owner=self.owner,
+                lock_expires_at=now
+                + timedelta(seconds=settings.SYNC_LOCK_LEASE_SECONDS),
+            )
             if not meta:
-                await self.create(
-                    sync_status="in_progress",
-                    last_sync_at=datetime.now(),
-                )
+                await self.create(**lease)
             else:
-                await self.update(
-                    sync_status="in_progress",
-                    last_sync_at=datetime.now(),
-                )
+                await self.update(**lease)
 
             return True, last_changed_at
 
+    async def renew_lock(self) -> bool:
+        """Продлить аренду. False - блокировка уже у другого владельца"""
+        result = await self.session.execute(
+            self._owned_update()
+            .values(
+                lock_expires_at=func.now()
+                + timedelta(seconds=settings.SYNC_LOCK_LEASE_SECONDS)
+            )
+            .returning(SyncMetadata.id)
+        )
+        renewed = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return renewed
+
     async def release_lock(
-        self, success: bool, last_changed_at: Optional[datetime] = None
+        self,
+        success: bool,
+        last_changed_at: Optional[datetime] = None,
+        last_event_id: Optional[str] = None,
     ) -> None:
-        """Снять блокировку после синхронизации"""
+        """Снять блокировку после синхронизации.
+
+        Курсор (last_changed_at, last_event_id) сдвигается, только если
+        прогон что-то принёс - иначе остаётся прежним. Успешный прогон
+        сбрасывает чекпоинт, неуспешный оставляет его для продолжения.
+        Если аренду уже перехватили, строка не трогается.
+        """
         logger.info(
             "Снятие блокировки",
             extra={
                 "success": success,
                 "last_changed_at": str(last_changed_at) if last_changed_at else None,
+                "last_event_id": last_event_id,
             },
         )
+        values = dict(lock_owner=None, lock_expires_at=None)
         if success:
-            await self.update(
-                last_changed_at=last_changed_at,
-                sync_status="success",
-            )
+            values.update(sync_status="success", **EMPTY_CHECKPOINT)
+            if last_changed_at is not None:
+                values.update(
+                    last_changed_at=last_changed_at, last_event_id=last_event_id
+                )
         else:
-            await self.update(sync_status="failed")
+            values.update(sync_status="failed")
+        result = await self.session.execute(
+            self._owned_update().values(**values).returning(SyncMetadata.id)
+        )
+        released = result.scalar_one_or_none() is not None
         await self.session.commit()
+        if not released:
+            logger.warning(
+                "Блокировка уже принадлежит другому владельцу, итог не записан",
+                extra={"owner": self.owner},
+            )
+            return
         logger.info("Блокировка успешно снята")
 
+    async def confirm_lock(self) -> None:
+        """Подтвердить и продлить аренду в текущей транзакции, без commit.
+
+        Выполняется перед фиксацией данных, чтобы они ушли в БД, только
+        пока блокировка наша; если её перехватили, поднимает SyncLockLost.
+        """
+        result = await self.session.execute(
+            self._owned_update()
+            .values(
+                lock_expires_at=func.now()
+                + timedelta(seconds=settings.SYNC_LOCK_LEASE_SECONDS)
+            )
+            .returning(SyncMetadata.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise SyncLockLost(self.owner)
+
+    async def save_checkpoint(
+        self, max_changed_at: Optional[datetime], max_event_id: Optional[str]
+    ) -> None:
+        """Запомнить курсор, с которого продолжать прогон. Фиксируется
+        вместе с данными общим commit сессии, поэтому сам не коммитит.
+
+        Если аренду перехватили, поднимает SyncLockLost: данные откатятся
+        вместе с чекпоинтом, и две реплики не перепишут прогресс друг друга.
+        """
+        result = await self.session.execute(
+            self._owned_update()
+            .values(
+                checkpoint_changed_at=max_changed_at,
+                checkpoint_event_id=max_event_id,
+            )
+            .returning(SyncMetadata.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise SyncLockLost(self.owner)
+
+    async def lease_owner(self) -> Optional[str]:
+        """Владелец действующей аренды или None, если блокировка свободна"""
+        result = await self.session.execute(
+            select(SyncMetadata.lock_owner).where(
+                SyncMetadata.id == 1,
+                SyncMetadata.sync_status == "in_progress",
+                SyncMetadata.lock_expires_at > func.now(),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    def _owned_update(self):
+        """UPDATE строки метаданных, пока блокировка у этого владельца"""
+        return update(SyncMetadata).where(
+            SyncMetadata.id == 1,
+            SyncMetadata.sync_status == "in_progress",
+            SyncMetadata.lock_owner == self.owner,
+        )
+
     async def get(self) -> Optional[SyncMetadata]:
         """Не блокирующие получение метаданных"""
         result = await self.session.execute(
@@ -88,3 +217,94 @@ class SyncMetadataRepository:
         self.session.add(meta)
         await self.session.commit()
         return meta
+
+
+class SyncRunRepository:
+    """Репозиторий для работы с таблицей SyncRun"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def start(self, mode: str = "incremental") -> SyncRun:
+        """Регистрирует начало прогона синхронизации"""
+        run = SyncRun(status="in_progress", mode=mode)
+        self.session.add(run)
+        await self.session.commit()
+        return run
+
+    async def finish(self, run_id: int, status: str, **stats) -> None:
+        """Фиксирует итог прогона и его статистику"""
+        await self.session.execute(
+            update(SyncRun)
+            .where(SyncRun.id == run_id)
+            .values(status=status, finished_at=func.now(), **stats)
+        )
+        await self.session.commit()
+
+    async def recent(self, limit: int = 10) -> Sequence[SyncRun]:
+        """Последние прогоны, новые первыми"""
+        result = await self.session.execute(
+            select(SyncRun).order_by(SyncRun.started_at.desc()).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def stage_seen(self, run_id: int, event_ids: Iterable[str]) -> None:
+        """Запоминает id событий, встреченных полной сверкой. Не коммитит:
+        фиксируется вместе с записанной пачкой"""
+        rows = [{"run_id": run_id, "event_id": event_id} for event_id in event_ids]
+        for start in range(0, len(rows), SEEN_CHUNK_SIZE):
+            await self.session.execute(
+                insert(SyncSeenEvent)
+                .values(rows[start : start + SEEN_CHUNK_SIZE])
+                .on_conflict_do_nothing()
+            )
+
+    async def mark_unseen_removed(self, run_id: int, batch_size: int) -> int:
+        """Помечает пропавшими до batch_size событий, не встреченных сверкой.
+
+        События, записанные уже после старта прогона (точечное обновление
+        при покупке билета), не трогаются: сверка могла пройти их страницу
+        раньше, чем они появились. Возвращает число помеченных строк.
+        """
+        started_at = (
+            select(SyncRun.started_at).where(SyncRun.id == run_id).scalar_subquery()
+        )
+        unseen = (
+            select(Event.id)
+            .where(
+                Event.removed_at.is_(None),
+                Event.synced_at < started_at,
+                ~exists().where(
+                    SyncSeenEvent.run_id == run_id,
+                    SyncSeenEvent.event_id == Event.id,
+                ),
+            )
+            .limit(batch_size)
+        )
+        result = await self.session.execute(
+            update(Event)
+            .where(Event.id.in_(unseen))
+            .values(removed_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def purge_stale_seen(self, run_id: int) -> None:
+        """Удаляет промежуточные id всех прогонов, кроме run_id.
+
+        Вызывается в начале сверки под арендой, когда другой сверки идти не
+        может: строки других прогонов - остатки упавших процессов, чей
+        SyncRun так и остался in_progress и до clear_seen не дошёл.
+        """
+        await self.session.execute(
+            delete(SyncSeenEvent).where(SyncSeenEvent.run_id != run_id)
+        )
+        await self.session.commit()
+
+    async def clear_seen(self, run_id: int) -> None:
+        """Удаляет промежуточные id прогона"""
+        await self.session.execute(
+            delete(SyncSeenEvent).where(SyncSeenEvent.run_id == run_id)
+        )
+        await self.session.commit()
@@ -1,22 +1,59 @@
-from fastapi import APIRouter, BackgroundTasks, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 
-from app.database import get_async_db
-from app.dependencies import get_sync_repo
-from app.sync.tasks import run_sync_task
+from fastapi import APIRouter, Depends, Query
+
+from app.dependencies import get_sync_repo, get_sync_run_repo
+from app.sync.repository import SyncMetadataRepository, SyncRunRepository
+from app.sync.schemas import SyncRunOut, SyncStatusResponse
+from app.sync.tasks import start_sync_task, sync_in_progress
 
 router = APIRouter(prefix="/sync", tags=["sync"])
 
 
 @router.post("/trigger", status_code=200)
 async def trigger_sync(
-    background_tasks: BackgroundTasks,
-    session: AsyncSession = Depends(get_async_db),
+    wait: bool = Query(False, description="Дождаться завершения прогона"),
+    reconcile: bool = Query(False, description="Полная сверка каталога"),
+    sync_repo: SyncMetadataRepository = Depends(get_sync_repo),
 ):
-    """Запуск синхронизации в фоне"""
-    sync_repo = await get_sync_repo(session)
-    locked, last_date = await sync_repo.acquire_lock()
-    if not locked:
+    """Запуск синхронизации в фоне.
+
+    Если прогон уже идёт в этом процессе, новый не запускается - вызов
+    присоединяется к нему. Если аренду держит другая реплика, прогон не
+    запускается вовсе: он всё равно был бы пропущен.
+    """
+    already_running = sync_in_progress(reconcile)
+    if not already_running:
+        owner = await sync_repo.lease_owner()
+        if owner is not None and owner != sync_repo.owner:
+            return {"status": "Синхронизация уже выполняется на другой реплике"}
+
+    task = start_sync_task(reconcile)
+    if wait:
+        completed = await asyncio.shield(task)
+        if not completed:
+            return {
+                "status": "Синхронизация пропущена: блокировку держит другой прогон"
+            }
+        return {"status": "Синхронизация завершена"}
+    if already_running:
         return {"status": "Синхронизация в процессе"}
-    background_tasks.add_task(run_sync_task)
     return {"status": "Синхронизация запущена"}
+
+
+@router.get("/status", response_model=SyncStatusResponse)
+async def sync_status(
+    limit: int = Query(10, ge=1, le=100, description="Сколько последних прогонов"),
+    sync_repo: SyncMetadataRepository = Depends(get_sync_repo),
+    run_repo: SyncRunRepository = Depends(get_sync_run_repo),
+):
+    """Состояние синхронизации и история последних прогонов"""
+    meta = await sync_repo.get()
+    runs = await run_repo.recent(limit=limit)
+    return SyncStatusResponse(
+        sync_status=meta.sync_status if meta else None,
+        last_sync_at=meta.last_sync_at if meta else None,
+        last_changed_at=meta.last_changed_at if meta else None,
+        checkpoint_changed_at=meta.checkpoint_changed_at if meta else None,
+        runs=[SyncRunOut.model_validate(run) for run in runs],
+    )
@@ -1,68 +1,64 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-from app.database import get_async_db
-from app.dependencies import (
-    get_event_repo,
-    get_place_repo,
-    get_provider_client,
-    get_sync_repo,
-)
+from app.config import settings
 from app.logger import logger
-from app.sync.deps import get_sync_usecase
+from app.sync.tasks import run_sync_task, sync_in_progress
 
 scheduler = AsyncIOScheduler()
 
 
 async def sync_job() -> None:
-    """Фоновая задача синхронизации"""
-    logger.info("Запуск фоновой задачи синхронизации")
+    """Фоновая задача инкрементальной синхронизации"""
+    if sync_in_progress():
+        logger.info("Синхронизация уже выполняется, присоединяемся к прогону")
     try:
-        async for session in get_async_db():
-            logger.debug("Сессия БД получена")
-            sync_repo = await get_sync_repo(session)
-            logger.debug("Попытка захвата блокировки")
-            locked, last_date = await sync_repo.acquire_lock()
-            logger.info(
-                "Результат захвата блокировки",
-                extra={
-                    "locked": locked,
-                    "last_date": str(last_date) if last_date else None,
-                },
-            )
-            if not locked:
-                logger.info("Синхронизация уже выполняется, выходим")
-                return
-
-            logger.info("Запуск usecase синхронизации")
-            try:
-                usecase = await get_sync_usecase(
-                    client=get_provider_client(),
-                    place_repo=await get_place_repo(session),
-                    event_repo=await get_event_repo(session),
-                    sync_repo=sync_repo,
-                )
-                await usecase.execute()
-                logger.info("Синхронизация успешно завершена")
-            except Exception as e:
-                logger.exception(
-                    "Ошибка при выполнении usecase", extra={"error": str(e)}
-                )
-                raise
+        if await run_sync_task():
+            logger.info("Синхронизация успешно завершена")
     except Exception as e:
         logger.exception(
             "Критическая ошибка в фоновой задаче синхронизации", extra={"error": str(e)}
         )
 
 
+async def reconcile_job() -> None:
+    """Фоновая задача полной сверки каталога"""
+    try:
+        if await run_sync_task(reconcile=True):
+            logger.info("Сверка каталога успешно завершена")
+    except Exception as e:
+        logger.exception(
+            "Критическая ошибка в фоновой сверке каталога", extra={"error": str(e)}
+        )
+
+
 def start_scheduler() -> None:
     """Старт планировщика"""
     logger.info("Запуск планировщика")
     scheduler.add_job(
         sync_job,
-        trigger=IntervalTrigger(days=1),
-        id="daily_sync",
+        trigger=IntervalTrigger(
+            seconds=settings.SYNC_INTERVAL_SECONDS,
+            jitter=settings.SYNC_INTERVAL_JITTER_SECONDS or None,
+        ),
+        id="incremental_sync",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=settings.SYNC_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        reconcile_job,
+        trigger=CronTrigger(
+            day_of_week=settings.SYNC_RECONCILE_DAY_OF_WEEK,
+            hour=settings.SYNC_RECONCILE_HOUR,
+            jitter=settings.SYNC_INTERVAL_JITTER_SECONDS or None,
+        ),
+        id="weekly_reconcile",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
         misfire_grace_time=3600,
     )
     scheduler.start()
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, computed_field
+
+
+class SyncRunOut(BaseModel):
+    """Прогон синхронизации из истории"""
+
+    id: int
+    started_at: datetime
+    finished_at: Optional[datetime]
+    status: str
+    mode: str
+    pages_fetched: int
+    rows_inserted: int
+    rows_updated: int
+    rows_skipped: int
+    rows_removed: int
+    bytes_received: int
+    provider_seconds: float
+    db_seconds: float
+    error: Optional[str]
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return round((self.finished_at - self.started_at).total_seconds(), 3)
+
+    @computed_field
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        if not self.duration_seconds:
+            return None
+        rows = self.rows_inserted + self.rows_updated + self.rows_skipped
+        return round(rows / self.duration_seconds, 1)
+
+
+class SyncStatusResponse(BaseModel):
+    """Текущее состояние синхронизации и последние прогоны"""
+
+    sync_status: Optional[str]
+    last_sync_at: Optional[datetime]
+    last_changed_at: Optional[datetime]
+    checkpoint_changed_at: Optional[datetime]
+    runs: List[SyncRunOut]
@@ -1,20 +1,112 @@
-from app.database import get_async_db
+import asyncio
+from contextlib import suppress
+from typing import Awaitable, Callable, Tuple
+
+from app.config import settings
+from app.database import AsyncSessionLocal, get_async_db
 from app.dependencies import (
     get_event_repo,
     get_place_repo,
     get_provider_client,
     get_sync_repo,
+    get_sync_run_repo,
 )
+from app.logger import logger
+from app.singleflight import SingleFlight
+from app.sync.repository import SyncMetadataRepository
 from app.sync.usecase import SyncEventsUsecase
 
+SYNC_FLIGHT_KEY = "sync"
+RECONCILE_FLIGHT_KEY = "reconcile"
+
+# Ручной запуск, планировщик и прочие вызовы внутри процесса делят
+# один прогон; между процессами их разводит блокировка в sync_metadata
+sync_flight = SingleFlight()
+
 
-async def run_sync_task():
-    """Фоновая задача: выполняет синхронизацию, используя свою сессию."""
+async def _run_sync_once(reconcile: bool = False) -> bool:
+    """Один прогон синхронизации в своей сессии.
+
+    Возвращает False, если блокировку держит другой прогон.
+    """
     async for session in get_async_db():
-        client = get_provider_client()
-        place_repo = await get_place_repo(session)
-        event_repo = await get_event_repo(session)
         sync_repo = await get_sync_repo(session)
+        locked, last_date = await sync_repo.acquire_lock()
+        logger.info(
+            "Результат захвата блокировки",
+            extra={
+                "locked": locked,
+                "last_date": str(last_date) if last_date else None,
+            },
+        )
+        if not locked:
+            logger.info("Синхронизация уже выполняется, прогон пропущен")
+            return False
+
+        usecase = SyncEventsUsecase(
+            get_provider_client(),
+            await get_place_repo(session),
+            await get_event_repo(session),
+            sync_repo,
+            await get_sync_run_repo(session),
+        )
+        heartbeat = asyncio.create_task(_keep_lease(sync_repo.owner))
+        try:
+            await usecase.execute(reconcile=reconcile)
+        except Exception as e:
+            logger.exception("Ошибка синхронизации", extra={"error": str(e)})
+            raise
+        finally:
+            heartbeat.cancel()
+        return True
+    return False
+
+
+async def _keep_lease(owner: str) -> None:
+    """Продлевает аренду блокировки, пока идёт прогон.
+
+    Сессия прогона занята конвейером, поэтому продление идёт в своей.
+    Если аренду перехватили, прогон упрётся в SyncLockLost на ближайшем
+    чекпоинте - здесь остаётся только перестать продлевать.
+    """
+    interval = settings.SYNC_LOCK_LEASE_SECONDS / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as session:
+                renewed = await SyncMetadataRepository(session, owner).renew_lock()
+        except Exception as e:
+            logger.warning("Не удалось продлить аренду", extra={"error": str(e)})
+            continue
+        if not renewed:
+            logger.error("Аренда блокировки потеряна", extra={"owner": owner})
+            return
+
+
+async def _run_reconcile_once() -> bool:
+    """Полная сверка каталога после уже идущего инкрементального прогона"""
+    if sync_in_progress():
+        # не спорим с ним за блокировку, а дожидаемся его
+        with suppress(Exception):
+            await sync_flight.do(SYNC_FLIGHT_KEY, _run_sync_once)
+    return await _run_sync_once(reconcile=True)
+
+
+def _flight(reconcile: bool) -> Tuple[str, Callable[[], Awaitable[bool]]]:
+    if reconcile:
+        return RECONCILE_FLIGHT_KEY, _run_reconcile_once
+    return SYNC_FLIGHT_KEY, _run_sync_once
+
+
+def start_sync_task(reconcile: bool = False) -> asyncio.Task:
+    """Запускает прогон или возвращает уже идущий - без ожидания"""
+    return sync_flight.start(*_flight(reconcile))
+
+
+def sync_in_progress(reconcile: bool = False) -> bool:
+    return sync_flight.in_flight(_flight(reconcile)[0])
+
 
-        usecase = SyncEventsUsecase(client, place_repo, event_repo, sync_repo)
-        await usecase.execute()
+async def run_sync_task(reconcile: bool = False) -> bool:
+    """Выполняет синхронизацию или дожидается уже идущего прогона"""
+    return await sync_flight.do(*_flight(reconcile))
@@ -1,14 +1,22 @@
-from datetime import datetime
-from typing import Optional
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
 
-from app.aggregator.events.models import Event
-from app.aggregator.events.repository import EventRepository
-from app.aggregator.places.models import Place
-from app.aggregator.places.repository import PlaceRepository
+from app.aggregator.events.repository import EVENT_UPDATE_COLUMNS, EventRepository
+from app.aggregator.places.repository import PLACE_UPDATE_COLUMNS, PlaceRepository
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.logger import logger
 from app.provider.client import EventsProviderClient
-from app.provider.paginator import EventsPaginator
-from app.sync.repository import SyncMetadataRepository
+from app.provider.paginator import EventsPage, EventsPaginator
+from app.provider.records import EventRecord, PlaceRecord
+from app.singleflight import SingleFlight
+from app.sync.fingerprint import content_hash
+from app.sync.models import SyncRun
+from app.sync.pipeline import Cursor, SyncBatch, SyncPipeline
+from app.sync.repository import SyncMetadataRepository, SyncRunRepository
+
+_refresh_flight = SingleFlight()
 
 
 class SyncEventsUsecase:
@@ -18,143 +26,301 @@ class SyncEventsUsecase:
         place_repo: PlaceRepository,
         event_repo: EventRepository,
         sync_repo: SyncMetadataRepository,
+        run_repo: SyncRunRepository,
     ):
         self.client = client
         self.place_repo = place_repo
         self.event_repo = event_repo
         self.sync_repo = sync_repo
+        self.run_repo = run_repo
+
+        self._cursor: Optional[Cursor] = None
+        self._max_cursor: Optional[Cursor] = None
+        self._place_hashes: Dict[str, str] = {}
+        self._pages_since_commit = 0
+        self._pages_written = 0
+        self._rows: Counter = Counter()
+        self._reconcile_run_id: Optional[int] = None
+
+    async def execute(
+        self, forced_changed_at: Optional[str] = None, reconcile: bool = False
+    ) -> None:
+        """Прогон синхронизации.
 
-    async def execute(self, forced_changed_at: Optional[str] = None) -> None:
+        reconcile=True - полная сверка: обходится весь каталог провайдера,
+        id встреченных событий копятся в промежуточной таблице, а события,
+        которых в каталоге не оказалось, помечаются removed_at пачками.
+        """
+        run: Optional[SyncRun] = None
+        pipeline: Optional[SyncPipeline] = None
+        bytes_before = self.client.bytes_received["get_events_page"]
         try:
+            run = await self.run_repo.start(
+                mode="reconcile" if reconcile else "incremental"
+            )
+            self._reconcile_run_id = run.id if reconcile else None
+            if reconcile:
+                await self.run_repo.purge_stale_seen(run.id)
             meta = await self.sync_repo.get()
-            if forced_changed_at:
+            self._cursor = None
+            if meta and meta.last_changed_at and not reconcile:
+                self._cursor = (meta.last_changed_at, meta.last_event_id or "")
+            self._max_cursor = None
+            self._place_hashes = {}
+            self._pages_since_commit = 0
+            self._pages_written = 0
+            self._rows = Counter()
+
+            if reconcile:
+                changed_at = "2000-01-01"
+            elif forced_changed_at:
                 changed_at = forced_changed_at
+            elif meta and meta.checkpoint_changed_at:
+                # Продолжаем прерванный прогон с курсора последнего коммита, а
+                # не со ссылки next: смещение страниц за это время могло
+                # сдвинуться. Уже записанное отсекает фильтр по курсору
+                checkpoint = (
+                    meta.checkpoint_changed_at,
+                    meta.checkpoint_event_id or "",
+                )
+                changed_at = meta.checkpoint_changed_at.isoformat()
+                self._cursor = self._max_cursor = checkpoint
+                logger.info(
+                    "Продолжение синхронизации с чекпоинта",
+                    extra={"checkpoint_changed_at": changed_at},
+                )
+            elif meta and meta.last_changed_at:
+                changed_at = meta.last_changed_at.isoformat()
             else:
-                if meta and meta.last_changed_at:
-                    changed_at = meta.last_changed_at.date().isoformat()
-                else:
-                    changed_at = "2000-01-01"
-
-            max_changed_at = None
-
-            async with self.client:
-                async for event_data in EventsPaginator(
-                    self.client, changed_at=changed_at
-                ):
-                    event_changed = datetime.fromisoformat(event_data["changed_at"])
+                changed_at = "2000-01-01"
 
-                    if meta and meta.last_changed_at:
-                        if event_changed <= meta.last_changed_at:
-                            continue
-
-                    await self._process_event(event_data)
-
-                    if max_changed_at is None or event_changed > max_changed_at:
-                        max_changed_at = event_changed
+            paginator = EventsPaginator(
+                self.client,
+                changed_at=changed_at,
+                prefetch=settings.SYNC_PREFETCH_PAGES,
+                stream=settings.SYNC_STREAM_PAGES,
+                stream_chunk=settings.SYNC_STREAM_CHUNK_EVENTS,
+                typed=True,
+            )
+            pipeline = SyncPipeline(
+                pages=paginator.pages(),
+                decode=self._decode_page,
+                write=self._write_batch,
+                queue_size=settings.SYNC_QUEUE_SIZE,
+                batch_size=settings.SYNC_BATCH_SIZE,
+                flush_interval=settings.SYNC_FLUSH_INTERVAL,
+            )
+            try:
+                await pipeline.run()
+            finally:
+                logger.info(
+                    "Статистика конвейера синхронизации",
+                    extra={"stages": pipeline.stats},
+                )
 
+            last_changed_at, last_event_id = self._max_cursor or (None, None)
+            await self.sync_repo.confirm_lock()
             await self.place_repo.session.commit()
+            if reconcile:
+                await self._mark_removed(run.id)
             logger.info(
                 "release_lock вызван",
-                extra={"success": True, "last_changed_at": str(max_changed_at)},
+                extra={"success": True, "last_changed_at": str(last_changed_at)},
             )
             await self.sync_repo.release_lock(
-                success=True, last_changed_at=max_changed_at
+                success=True,
+                last_changed_at=last_changed_at,
+                last_event_id=last_event_id,
             )
             logger.info("release_lock выполнен")
+            await self.run_repo.finish(
+                run.id, "success", **self._run_stats(pipeline, bytes_before)
+            )
 
         except Exception as e:
             logger.exception("Ошибка синхронизации", extra={"error": str(e)})
+            # Незафиксированный хвост откатываем: следующий прогон повторит его
+            # с чекпоинта
+            await self.place_repo.session.rollback()
             await self.sync_repo.release_lock(success=False)
+            if run is not None:
+                await self.run_repo.finish(
+                    run.id,
+                    "failed",
+                    error=repr(e),
+                    **self._run_stats(pipeline, bytes_before),
+                )
             raise
+        finally:
+            if reconcile and run is not None:
+                # ошибка очистки не должна подменять исходную ошибку прогона;
+                # оставшиеся строки удалит следующая сверка
+                try:
+                    await self.run_repo.clear_seen(run.id)
+                except Exception as e:
+                    logger.exception(
+                        "Не удалось очистить id встреченных событий",
+                        extra={"run_id": run.id, "error": str(e)},
+                    )
 
-    async def _process_event(self, event_data: dict) -> None:
-        logger.debug("Обработка события", extra={"event_id": str(event_data.get("id"))})
-
-        place_data = event_data["place"]
-        place = await self.place_repo.get(place_data["id"])
-        if not place:
-            place = Place(
-                id=place_data["id"],
-                name=place_data["name"],
-                city=place_data["city"],
-                address=place_data["address"],
-                seats_pattern=place_data["seats_pattern"],
-                changed_at=datetime.fromisoformat(place_data["changed_at"]),
-                created_at=datetime.fromisoformat(place_data["created_at"]),
-            )
-            logger.debug(
-                "Создана новая площадка",
-                extra={
-                    "place_id": str(place_data["id"]),
-                    "place_name": place_data["name"],
-                },
+    async def _mark_removed(self, run_id: int) -> None:
+        """Помечает пропавшими события, которых не было в каталоге, пачками"""
+        seen = sum(self._rows[key] for key in ("inserted", "updated", "skipped"))
+        if not seen:
+            # пустой каталог скорее сбой провайдера, чем удаление всех событий
+            logger.warning("Сверка не встретила ни одного события, пометки пропущены")
+            return
+        while True:
+            # пометки - только пока аренда наша: проверка и пачка в одной
+            # транзакции, mark_unseen_removed её фиксирует
+            await self.sync_repo.confirm_lock()
+            removed = await self.run_repo.mark_unseen_removed(
+                run_id, settings.SYNC_REMOVE_BATCH_SIZE
             )
-        else:
-            place.name = place_data["name"]
-            place.city = place_data["city"]
-            place.address = place_data["address"]
-            place.seats_pattern = place_data["seats_pattern"]
-            place.changed_at = datetime.fromisoformat(place_data["changed_at"])
-            logger.debug(
-                "Обновлена площадка",
-                extra={
-                    "place_id": str(place_data["id"]),
-                    "place_name": place_data["name"],
-                },
+            self._rows["removed"] += removed
+            if removed < settings.SYNC_REMOVE_BATCH_SIZE:
+                break
+        logger.info(
+            "Сверка каталога завершена",
+            extra={"seen": seen, "removed": self._rows["removed"]},
+        )
+
+    def _run_stats(
+        self, pipeline: Optional[SyncPipeline], bytes_before: int
+    ) -> Dict[str, Any]:
+        """Статистика прогона для истории: объёмы и время провайдера против БД"""
+        stats = {
+            "pages_fetched": self._pages_written,
+            "rows_inserted": self._rows["inserted"],
+            "rows_updated": self._rows["updated"],
+            "rows_skipped": self._rows["skipped"],
+            "rows_removed": self._rows["removed"],
+            "bytes_received": self.client.bytes_received["get_events_page"]
+            - bytes_before,
+        }
+        if pipeline is not None:
+            stats.update(
+                provider_seconds=pipeline.fetch_stats.busy_seconds,
+                db_seconds=pipeline.write_stats.busy_seconds,
             )
+        return stats
 
-        await self.place_repo.save(place)
-
-        event = await self.event_repo.get(event_data["id"])
-        if not event:
-            event = Event(
-                id=event_data["id"],
-                name=event_data["name"],
-                place_id=place_data["id"],
-                event_time=datetime.fromisoformat(event_data["event_time"]),
-                registration_deadline=datetime.fromisoformat(
-                    event_data["registration_deadline"]
-                ),
-                status=event_data["status"],
-                number_of_visitors=event_data["number_of_visitors"],
-                changed_at=datetime.fromisoformat(event_data["changed_at"]),
-                created_at=datetime.fromisoformat(event_data["created_at"]),
-                status_changed_at=datetime.fromisoformat(
-                    event_data["status_changed_at"]
-                )
-                if event_data.get("status_changed_at")
-                else None,
+    async def refresh_event(self, event_id: str) -> None:
+        """Точечно сверяет одно событие с провайдером.
+
+        Если локальная строка моложе EVENT_STALENESS_SECONDS, провайдер не
+        запрашивается вовсе; иначе - один запрос за событием и upsert.
+        """
+        event = await self.event_repo.get(event_id)
+        stale_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.EVENT_STALENESS_SECONDS
+        )
+        if event is not None and event.synced_at >= stale_before:
+            return
+
+        # Параллельные покупки билетов на одно событие делят один запрос
+        # к провайдеру; все вызывающие перечитывают строку после его коммита
+        await _refresh_flight.do(event_id, lambda: self._store_event(event_id))
+        if event is not None:
+            await self.event_repo.session.refresh(event)
+        logger.debug("Событие обновлено точечно", extra={"event_id": event_id})
+
+    async def _store_event(self, event_id: str) -> None:
+        """Запрашивает событие у провайдера и сохраняет его.
+
+        Общая задача переживает отмену запустившего её запроса, чья сессия
+        при этом закрывается, поэтому пишет в собственной сессии.
+        """
+        record = EventRecord.from_payload(await self.client.get_event(event_id))
+        async with AsyncSessionLocal() as session:
+            await PlaceRepository(session).upsert_many([self._place_row(record.place)])
+            await EventRepository(session).upsert_many(
+                [self._event_row(record)], only_changed=False
             )
-            logger.debug(
-                "Создано новое событие",
-                extra={
-                    "event_id": str(event_data["id"]),
-                    "place_id": str(place_data["id"]),
-                    "status": event_data["status"],
-                },
+            await session.commit()
+
+    def _decode_page(self, page: EventsPage) -> SyncBatch:
+        """Превращает страницу провайдера в пачку строк, отбрасывая уже известное"""
+        # части одной страницы при потоковом чтении считаются страницей один раз
+        batch = SyncBatch(pages=0 if page.partial else 1, next_url=page.next_url)
+        for record in page.results:
+            if self._cursor is not None and record.cursor <= self._cursor:
+                continue
+            batch.add(self._place_row(record.place), self._event_row(record))
+        return batch
+
+    async def _write_batch(self, batch: SyncBatch) -> None:
+        """Записывает пачку одним upsert для площадок и одним для событий"""
+        # Площадка повторяется во множестве событий: в рамках прогона
+        # отправляем её в БД, только если отпечаток изменился
+        places = [
+            row
+            for row in batch.places.values()
+            if self._place_hashes.get(row["id"]) != row["content_hash"]
+        ]
+        if places:
+            await self.place_repo.upsert_many(places)
+            for row in places:
+                self._place_hashes[row["id"]] = row["content_hash"]
+
+        inserted = updated = 0
+        if batch.events:
+            inserted, updated = await self.event_repo.upsert_many(
+                list(batch.events.values())
             )
+        self._rows["inserted"] += inserted
+        self._rows["updated"] += updated
+        self._rows["skipped"] += len(batch.events) - inserted - updated
+        if self._reconcile_run_id is not None:
+            await self.run_repo.stage_seen(self._reconcile_run_id, batch.events.keys())
+
+        if batch.max_cursor is not None:
+            if self._max_cursor is None or batch.max_cursor > self._max_cursor:
+                self._max_cursor = batch.max_cursor
+
+        self._pages_since_commit += batch.pages
+        self._pages_written += batch.pages
+        if (
+            batch.next_url
+            and self._pages_since_commit >= settings.SYNC_COMMIT_EVERY_PAGES
+        ):
+            await self._commit_checkpoint()
+        logger.debug(
+            "Пачка событий записана",
+            extra={
+                "places": len(places),
+                "events": len(batch.events),
+                "inserted": inserted,
+                "updated": updated,
+                "skipped": len(batch.events) - inserted - updated,
+            },
+        )
+
+    async def _commit_checkpoint(self) -> None:
+        """Фиксирует записанные страницы вместе с чекпоинтом одной транзакцией"""
+        max_changed_at, max_event_id = self._max_cursor or (None, None)
+        # сверку не продолжаем с середины: id встреченных событий живут
+        # только в рамках прогона, поэтому её чекпоинт не сохраняем, но
+        # аренду проверяем так же - save_checkpoint делает это сам
+        if self._reconcile_run_id is None:
+            await self.sync_repo.save_checkpoint(max_changed_at, max_event_id)
         else:
-            event.name = event_data["name"]
-            event.place_id = place_data["id"]
-            event.event_time = datetime.fromisoformat(event_data["event_time"])
-            event.registration_deadline = datetime.fromisoformat(
-                event_data["registration_deadline"]
-            )
-            event.status = event_data["status"]
-            event.number_of_visitors = event_data["number_of_visitors"]
-            event.changed_at = datetime.fromisoformat(event_data["changed_at"])
-            event.status_changed_at = (
-                datetime.fromisoformat(event_data["status_changed_at"])
-                if event_data.get("status_changed_at")
-                else None
-            )
-            logger.debug(
-                "Обновлено событие",
-                extra={
-                    "event_id": str(event_data["id"]),
-                    "place_id": str(place_data["id"]),
-                    "status": event_data["status"],
-                },
-            )
+            await self.sync_repo.confirm_lock()
+        await self.place_repo.session.commit()
+        self._pages_since_commit = 0
+        logger.info(
+            "Чекпоинт синхронизации сохранён",
+            extra={"max_changed_at": str(max_changed_at)},
+        )
+
+    @staticmethod
+    def _place_row(place: PlaceRecord) -> Dict[str, Any]:
+        row = place.as_row()
+        row["content_hash"] = content_hash(row, PLACE_UPDATE_COLUMNS)
+        return row
 
-        await self.event_repo.save(event)
+    @staticmethod
+    def _event_row(event: EventRecord) -> Dict[str, Any]:
+        row = event.as_row()
+        row["content_hash"] = content_hash(row, EVENT_UPDATE_COLUMNS)
+        return row
@@ -1,3 +1,5 @@
+import asyncio
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -21,9 +23,11 @@ def mock_response_factory():
     def _create_mock_response(status=200, json_data=None):
         mock = AsyncMock(spec=ClientResponse)
         mock.status = status
+        mock.headers = {}
         mock.__aenter__ = AsyncMock(return_value=mock)
         mock.__aexit__ = AsyncMock(return_value=None)
         mock.json = AsyncMock(return_value=json_data or {})
+        mock.read = AsyncMock(return_value=json.dumps(json_data or {}).encode())
         return mock
 
     return _create_mock_response
@@ -45,6 +49,24 @@ def patched_client(client, mock_session):
 
 
 @pytest.fixture
-def mock_sync_session():
-    """Мок для синхронной сессии (requests. Session)."""
-    return MagicMock()
+def paged_provider():
+    """Фабрика мока get_events_page, отдающего страницы по цепочке ссылок next.
+
+    Первая страница запрашивается без url, следующие - по ссылкам
+    page-1, page-2, ...
+    """
+
+    def _create_paged_provider(pages):
+        responses = {}
+        for index, results in enumerate(pages):
+            url = None if index == 0 else f"page-{index}"
+            next_url = f"page-{index + 1}" if index + 1 < len(pages) else None
+            responses[url] = {"next": next_url, "results": results}
+
+        async def get_events_page(changed_at=None, url=None):
+            await asyncio.sleep(0)
+            return responses[url]
+
+        return AsyncMock(side_effect=get_events_page)
+
+    return _create_paged_provider
@@ -0,0 +1,82 @@
+import pytest
+
+from app.provider.circuit_breaker import CircuitBreaker, CircuitState
+from app.provider.exceptions import ProviderCircuitOpenError, ProviderTemporaryError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock):
+    return CircuitBreaker(
+        window=4,
+        min_calls=4,
+        failure_rate=0.5,
+        open_seconds=10,
+        failure_types=(ProviderTemporaryError,),
+        clock=clock,
+    )
+
+
+def call(breaker, error=None):
+    with breaker.guard():
+        if error is not None:
+            raise error
+
+
+def fail(breaker):
+    with pytest.raises(ProviderTemporaryError):
+        call(breaker, ProviderTemporaryError(status=503))
+
+
+def test_opens_on_failure_rate_and_fails_fast():
+    """Доля отказов в окне размыкает автомат, дальше вызовы отбиваются сразу"""
+    breaker = make_breaker(FakeClock())
+    call(breaker)
+    call(breaker)
+    fail(breaker)
+    assert breaker.state is CircuitState.CLOSED
+
+    fail(breaker)
+
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(ProviderCircuitOpenError):
+        call(breaker)
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_client_errors_do_not_count_as_failures():
+    """4xx - провайдер ответил, автомат не размыкается"""
+    breaker = make_breaker(FakeClock())
+
+    for _ in range(10):
+        with pytest.raises(ValueError):
+            call(breaker, ValueError("400"))
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    """После паузы проходит одна проба: успех замыкает, отказ снова размыкает"""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        fail(breaker)
+
+    clock.now = 10
+    assert breaker.state is CircuitState.HALF_OPEN
+    fail(breaker)
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now = 20
+    with breaker.guard():
+        # пока проба в полёте, остальные вызовы отбиваются
+        with pytest.raises(ProviderCircuitOpenError):
+            call(breaker)
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.snapshot()["window_calls"] == 0
@@ -0,0 +1,41 @@
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestServer
+
+from app.benchmarks.fake_provider import FakeEventsProvider
+from app.benchmarks.synthetic import make_events
+from app.provider.client import EventsProviderClient
+from app.provider.paginator import EventsPaginator
+
+
+@pytest_asyncio.fixture
+async def provider_url():
+    """Фейковый провайдер на случайном локальном порту"""
+    provider = FakeEventsProvider(make_events(25, places_count=3), page_size=10)
+    async with TestServer(provider.create_app()) as server:
+        yield str(server.make_url("")).rstrip("/")
+
+
+@pytest.mark.asyncio
+async def test_client_walks_all_pages(provider_url):
+    """Клиент с пагинатором проходит весь каталог фейкового провайдера"""
+    client = EventsProviderClient(api_key="test", base_url=provider_url)
+    paginator = EventsPaginator(client, changed_at="2000-01-01", typed=True)
+
+    pages = [len(page) async for page in paginator.pages()]
+
+    assert pages == [10, 10, 5]
+
+
+@pytest.mark.asyncio
+async def test_changed_at_filters_catalog(provider_url):
+    """Фильтр changed_at отдаёт только события не старше курсора"""
+    events = make_events(25, places_count=3)
+    client = EventsProviderClient(api_key="test", base_url=provider_url)
+
+    async with client:
+        page = await client.get_events_page(changed_at=events[20]["changed_at"])
+
+    assert [event["id"] for event in page["results"]] == [
+        event["id"] for event in events[20:]
+    ]
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.provider.exceptions import ProviderTemporaryError
+from app.provider.hedging import Hedger
+
+
+def make_hedger(**kwargs):
+    options = dict(min_delay=0.01, min_samples=3, max_extra_ratio=0.5)
+    options.update(kwargs)
+    return Hedger(**options)
+
+
+async def warm_up(hedger, operation="seats", samples=3):
+    async def fast():
+        return "fast"
+
+    for _ in range(samples):
+        await hedger.run(operation, fast)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_enough_samples():
+    hedger = make_hedger()
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    assert await hedger.run("seats", slow) == "slow"
+    assert calls == 1
+    assert hedger.hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_stuck_primary():
+    hedger = make_hedger()
+    await warm_up(hedger)
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            await asyncio.sleep(10)
+            return "primary"
+        return "hedge"
+
+    assert await asyncio.wait_for(hedger.run("seats", call), timeout=1) == "hedge"
+    assert hedger.hedged == 1
+    assert hedger.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_back_to_primary():
+    hedger = make_hedger()
+    await warm_up(hedger)
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            return "primary"
+        raise ProviderTemporaryError(status=503)
+
+    assert await hedger.run("seats", call) == "primary"
+    assert hedger.hedge_wins == 0
+
+
+@pytest.mark.asyncio
+async def test_extra_load_is_capped():
+    hedger = make_hedger(max_extra_ratio=0.01, budget_window=100)
+    # один медленный ответ не должен сдвинуть перцентиль
+    await warm_up(hedger, samples=20)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "slow"
+
+    await hedger.run("seats", slow)
+    await hedger.run("seats", slow)
+
+    snapshot = hedger.snapshot()
+    assert snapshot["hedged"] == 1
+    assert snapshot["budget_exhausted"] == 1
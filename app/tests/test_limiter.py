@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.provider.limiter import AdaptiveLimiter, Priority
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_jump_the_queue():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    order = []
+
+    async def call(name, priority):
+        async with limiter.slot(priority):
+            order.append(name)
+
+    await limiter.acquire(Priority.BACKGROUND)
+    waiting = [
+        asyncio.create_task(call("sync", Priority.BACKGROUND)),
+        asyncio.create_task(call("seats", Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*waiting)
+
+    assert order == ["seats", "sync"]
+    assert limiter.in_flight == 0
+
+
+def test_overload_halves_limit_once_per_interval():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial=20, backoff=0.5, clock=clock)
+
+    limiter.on_overload()
+    limiter.on_overload()
+    assert limiter.capacity == 10
+
+    clock.now = 2.0
+    limiter.on_overload()
+    assert limiter.capacity == 5
+    assert limiter.throttled == 3
+
+
+def test_success_grows_limit_up_to_max():
+    limiter = AdaptiveLimiter(initial=2, max_limit=3)
+    for _ in range(50):
+        limiter.on_success()
+    assert limiter.capacity == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_new_calls():
+    limiter = AdaptiveLimiter(initial=5)
+    limiter.on_overload(retry_after=0.05)
+
+    acquired = asyncio.create_task(limiter.acquire(Priority.INTERACTIVE))
+    await asyncio.sleep(0.01)
+    assert not acquired.done()
+
+    await asyncio.wait_for(acquired, timeout=1)
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    await limiter.acquire(Priority.BACKGROUND)
+
+    waiter = asyncio.create_task(limiter.acquire(Priority.INTERACTIVE))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    limiter.release()
+    assert limiter.in_flight == 0
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.provider.paginator import EventsPaginator
+from app.provider.streaming import StreamedPage
+
+
+@pytest.fixture
+def make_client(paged_provider):
+    """Клиент, отдающий страницы по цепочке ссылок next"""
+
+    def _make_client(pages):
+        client = MagicMock()
+        client.get_events_page = paged_provider(pages)
+        client.close = AsyncMock()
+        return client
+
+    return _make_client
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prefetch", [0, 2])
+async def test_pages_in_order(prefetch, make_client):
+    """Страницы отдаются по порядку с подгрузкой и без неё"""
+    client = make_client([[1, 2], [3], [4, 5]])
+    paginator = EventsPaginator(client, changed_at="2000-01-01", prefetch=prefetch)
+
+    pages = [page.results async for page in paginator.pages()]
+
+    assert pages == [[1, 2], [3], [4, 5]]
+
+
+@pytest.mark.asyncio
+async def test_events_iteration_with_prefetch(make_client):
+    """Поэлементный обход работает поверх фоновой подгрузки"""
+    client = make_client([[1, 2], [3]])
+    paginator = EventsPaginator(client, prefetch=1)
+
+    events = [event async for event in paginator]
+
+    assert events == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_is_bounded(make_client):
+    """Пока потребитель стоит, загружается не больше prefetch страниц впрок"""
+    client = make_client([[i] for i in range(10)])
+    paginator = EventsPaginator(client, prefetch=2)
+
+    pages = paginator.pages()
+    assert (await anext(pages)).results == [0]
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    # текущая страница + 2 в буфере + 1, ожидающая места в буфере
+    assert client.get_events_page.await_count == 4
+    await pages.aclose()
+    assert paginator._prefetch_task is None
+
+
+@pytest.mark.asyncio
+async def test_prefetch_propagates_errors():
+    """Ошибка фоновой загрузки пробрасывается потребителю"""
+    client = MagicMock()
+    client.get_events_page = AsyncMock(side_effect=RuntimeError("boom"))
+    paginator = EventsPaginator(client, prefetch=2)
+
+    with pytest.raises(RuntimeError):
+        async for _ in paginator.pages():
+            pass
+
+
+@pytest.fixture
+def make_streaming_client(make_client):
+    """Клиент, отдающий страницы потоково по кускам тела"""
+
+    def _make_streaming_client(pages):
+        client = make_client(pages)
+
+        @asynccontextmanager
+        async def stream_events_page(changed_at=None, url=None):
+            body = json.dumps(await client.get_events_page(url=url)).encode()
+
+            async def chunks():
+                for start in range(0, len(body), 5):
+                    yield body[start : start + 5]
+
+            yield StreamedPage(chunks())
+
+        client.stream_events_page = stream_events_page
+        return client
+
+    return _make_streaming_client
+
+
+@pytest.mark.asyncio
+async def test_streamed_pages_split_into_chunks(make_streaming_client):
+    """Потоковый режим отдаёт страницу частями, next - только у последней"""
+    client = make_streaming_client([[1, 2, 3], [4]])
+    paginator = EventsPaginator(client, stream=True, stream_chunk=2)
+
+    pages = [
+        (page.results, page.next_url, page.partial) async for page in paginator.pages()
+    ]
+
+    assert pages == [
+        ([1, 2], None, True),
+        ([3], "page-1", False),
+        ([4], None, False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_streamed_events_iteration(make_streaming_client):
+    """Поэлементный обход в потоковом режиме проходит все страницы"""
+    client = make_streaming_client([[1, 2], [3]])
+    paginator = EventsPaginator(client, stream=True)
+
+    assert [event async for event in paginator] == [1, 2, 3]
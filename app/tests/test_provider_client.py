@@ -1,10 +1,18 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from aiohttp import ClientSession
-from requests import Response
 
+from app.config import settings
+from app.dependencies import get_provider_client, init_provider_client
 from app.provider.client import EventsProviderClient, EventsProviderError
+from app.provider.exceptions import (
+    ProviderCircuitOpenError,
+    ProviderPayloadError,
+    ProviderTemporaryError,
+)
+from app.provider.http_cache import ConditionalCache
 
 
 @pytest.mark.asyncio
@@ -46,6 +54,20 @@ async def test_get_events_page_with_url(
     )
 
 
+@pytest.mark.asyncio
+async def test_get_event_success(patched_client, mock_session, mock_response_factory):
+    """Получение одного события по id"""
+    mock_response = mock_response_factory(status=200, json_data={"id": "event-123"})
+    mock_session.request.return_value = mock_response
+
+    event = await patched_client.get_event("event-123")
+
+    assert event == {"id": "event-123"}
+    mock_session.request.assert_called_once_with(
+        "GET", "https://test.events-provider.com/api/events/event-123/"
+    )
+
+
 @pytest.mark.asyncio
 async def test_get_event_seats_success(
     patched_client, mock_session, mock_response_factory
@@ -126,25 +148,24 @@ async def test_max_retries_exceeded(
     assert mock_session.request.call_count == expected_calls
 
 
-def test_register_success(client, mock_sync_session):
-    """Успешная синхронная регистрация"""
-    mock_response = MagicMock(spec=Response)
-    mock_response.status_code = 201
-    mock_response.json.return_value = {"ticket_id": "ticket-123"}
-
-    mock_sync_session.post.return_value = mock_response
+@pytest.mark.asyncio
+async def test_register_success(patched_client, mock_session, mock_response_factory):
+    """Успешная регистрация через общую асинхронную сессию"""
+    mock_session.request.return_value = mock_response_factory(
+        status=201, json_data={"ticket_id": "ticket-123"}
+    )
 
-    with patch.object(client, "_sync_session", mock_sync_session):
-        result = client.register(
-            event_id="event-123",
-            first_name="Иван",
-            last_name="Иванов",
-            email="ivan@example.com",
-            seat="A15",
-        )
+    result = await patched_client.register(
+        event_id="event-123",
+        first_name="Иван",
+        last_name="Иванов",
+        email="ivan@example.com",
+        seat="A15",
+    )
 
     assert result == {"ticket_id": "ticket-123"}
-    mock_sync_session.post.assert_called_once_with(
+    mock_session.request.assert_called_once_with(
+        "POST",
         "https://test.events-provider.com/api/events/event-123/register/",
         json={
             "event_id": "event-123",
@@ -156,32 +177,30 @@ def test_register_success(client, mock_sync_session):
     )
 
 
-def test_register_error(client, mock_sync_session):
+@pytest.mark.asyncio
+async def test_register_error(patched_client, mock_session, mock_response_factory):
     """Ошибка регистрации (например, место занято)"""
-    mock_response = MagicMock(spec=Response)
-    mock_response.status_code = 400
-    mock_response.reason = "Bad Request"
-
-    mock_sync_session.post.return_value = mock_response
-
-    with patch.object(client, "_sync_session", mock_sync_session):
-        with pytest.raises(EventsProviderError) as exc_info:
-            client.register(
-                event_id="event-123",
-                first_name="Иван",
-                last_name="Иванов",
-                email="ivan@example.com",
-                seat="A15",
-            )
+    response = mock_response_factory(status=400)
+    response.reason = "Bad Request"
+    mock_session.request.return_value = response
+
+    with pytest.raises(EventsProviderError) as exc_info:
+        await patched_client.register(
+            event_id="event-123",
+            first_name="Иван",
+            last_name="Иванов",
+            email="ivan@example.com",
+            seat="A15",
+        )
 
     assert exc_info.value.status == 400
+    mock_session.request.assert_called_once()
 
 
 def test_client_headers():
     """Проверка заголовков с API-ключом"""
     client = EventsProviderClient(api_key="my-key", base_url="http://test.com")
     assert client.headers == {"x-api-key": "my-key"}
-    assert client._sync_session.headers.get("x-api-key") == "my-key"
 
 
 @pytest.mark.asyncio
@@ -196,11 +215,6 @@ async def test_close():
     mock_session.close.assert_awaited_once()
     assert client._session is None
 
-    mock_sync_session = MagicMock()
-    client._sync_session = mock_sync_session
-    client.close_sync()
-    mock_sync_session.close.assert_called_once()
-
 
 @pytest.mark.asyncio
 async def test_context_manager():
@@ -214,3 +228,207 @@ async def test_context_manager():
         assert cm is client
 
     mock_session.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_session_is_pooled_and_reused():
+    """Одна сессия с настроенным пулом на все запросы, пока клиент не закрыт"""
+    client = EventsProviderClient(api_key="key", base_url="http://test.com")
+
+    session = await client._get_session()
+    assert await client._get_session() is session
+    assert session.connector.limit_per_host == settings.PROVIDER_POOL_PER_HOST
+
+    await client.close()
+    assert await client._get_session() is not session
+    await client.close()
+
+
+def test_provider_client_is_shared():
+    """Зависимость отдаёт общий клиент приложения"""
+    client = init_provider_client()
+
+    assert get_provider_client() is client
+    assert get_provider_client() is client
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_network(patched_client, mock_session):
+    """Разомкнутый автомат отбивает запрос без обращения к сети и без повторов"""
+    for _ in range(settings.PROVIDER_BREAKER_WINDOW):
+        patched_client.breaker._on_failure(probe=False)
+
+    with pytest.raises(ProviderCircuitOpenError):
+        await patched_client.get_event_seats("event-123")
+
+    mock_session.request.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_serves_cached_body_on_304(
+    patched_client, mock_session, mock_response_factory
+):
+    """Повторный GET уходит с валидаторами, на 304 тело берётся из кэша"""
+    fresh = mock_response_factory(status=200, json_data={"seats": ["A1"]})
+    fresh.headers = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2026 00:00:00 GMT"}
+    mock_session.request.side_effect = [fresh, mock_response_factory(status=304)]
+
+    first = await patched_client.get_event_seats("event-123")
+    second = await patched_client.get_event_seats("event-123")
+
+    assert first == second == ["A1"]
+    assert mock_session.request.call_args.kwargs["headers"] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jan 2026 00:00:00 GMT",
+    }
+    assert patched_client.http_cache.snapshot()["hits"] == 1
+
+
+def test_conditional_cache_is_bounded():
+    """Кэш держит не больше max_entries URL, вытесняя давно не использованные"""
+    cache = ConditionalCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.store(key, {"ETag": key}, {"key": key})
+
+    assert cache.conditional_headers("a") == {}
+    assert cache.conditional_headers("c") == {"If-None-Match": "c"}
+    assert cache.snapshot()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_429_honours_retry_after_and_shrinks_limit(
+    patched_client, mock_session, mock_response_factory
+):
+    """На 429 клиент ждёт Retry-After, а не экспоненту, и сужает окно"""
+    throttled = mock_response_factory(status=429)
+    throttled.headers = {"Retry-After": "0"}
+    mock_session.request.side_effect = [
+        throttled,
+        mock_response_factory(status=200, json_data={"seats": ["A1"]}),
+    ]
+    limit = patched_client.limiter.capacity
+
+    assert await patched_client.get_event_seats("event-123") == ["A1"]
+    assert patched_client.limiter.throttled == 1
+    assert patched_client.limiter.capacity < limit
+    assert patched_client.limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_record_latency_statuses_and_retries(
+    patched_client, mock_session, mock_response_factory
+):
+    """Попытки попадают в гистограмму и счётчики статусов, повтор - в retries"""
+    mock_session.request.side_effect = [
+        mock_response_factory(status=500),
+        mock_response_factory(status=200, json_data={"seats": ["A1"]}),
+    ]
+
+    await patched_client.get_event_seats("event-123")
+
+    seats = patched_client.metrics.snapshot()["get_event_seats"]
+    assert seats["latency_seconds"]["count"] == 2
+    assert seats["statuses"] == {"200": 1, "500": 1}
+    assert seats["retries"] == {"ProviderTemporaryError": 1}
+    assert seats["bytes_received"] > 0
+
+
+@pytest.mark.asyncio
+async def test_304_after_eviction_refetches_without_validators(
+    patched_client, mock_session, mock_response_factory
+):
+    """Запись кэша пропала до прихода 304 - тело запрашивается заново"""
+    fresh = mock_response_factory(status=200, json_data={"seats": ["A1"]})
+    fresh.headers = {"ETag": '"v1"'}
+    refetched = mock_response_factory(status=200, json_data={"seats": ["A2"]})
+    mock_session.request.side_effect = [
+        fresh,
+        mock_response_factory(status=304),
+        refetched,
+    ]
+    await patched_client.get_event_seats("event-123")
+
+    original_request = mock_session.request.side_effect
+
+    def evict_then_request(*args, **kwargs):
+        patched_client.http_cache._entries.clear()
+        return next(original_request)
+
+    mock_session.request.side_effect = evict_then_request
+
+    assert await patched_client.get_event_seats("event-123") == ["A2"]
+    assert "headers" not in mock_session.request.call_args.kwargs
+
+
+@pytest.mark.asyncio
+async def test_events_pages_are_not_cached(
+    patched_client, mock_session, mock_response_factory
+):
+    """Страницы синхронизации не оседают в условном кэше"""
+    page = mock_response_factory(status=200, json_data={"results": []})
+    page.headers = {"ETag": '"p1"'}
+    mock_session.request.return_value = page
+
+    await patched_client.get_events_page()
+
+    assert patched_client.http_cache.snapshot()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_register_not_resent_after_read_timeout(
+    patched_client, mock_session, mock_response_factory
+):
+    """Таймаут ответа на регистрацию не повторяется: билет мог быть создан"""
+    mock_session.request.side_effect = asyncio.TimeoutError()
+
+    with pytest.raises(ProviderTemporaryError):
+        await patched_client.register("event-123", "Иван", "Иванов", "i@x.ru", "A1")
+
+    assert mock_session.request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_register_retried_after_503(
+    patched_client, mock_session, mock_response_factory
+):
+    """На 503 провайдер регистрацию не выполнял - её можно повторить"""
+    unavailable = mock_response_factory(status=503)
+    unavailable.headers = {"Retry-After": "0"}
+    mock_session.request.side_effect = [
+        unavailable,
+        mock_response_factory(status=201, json_data={"ticket_id": "t-1"}),
+    ]
+
+    result = await patched_client.register(
+        "event-123", "Иван", "Иванов", "i@x.ru", "A1"
+    )
+
+    assert result == {"ticket_id": "t-1"}
+    assert mock_session.request.call_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body",
+    [b'{"next": null, "results": [{"id": "e1"}, {"id": "e', b'{"results": [\xff]}'],
+    ids=["truncated", "garbled"],
+)
+async def test_stream_with_broken_body_raises_payload_error(
+    patched_client, mock_session, body
+):
+    """Обрезанное или испорченное тело потоковой страницы - ошибка формата"""
+
+    async def chunks(size):
+        yield body
+
+    response = MagicMock(status=200, headers={})
+    response.content.iter_chunked = chunks
+    mock_session.request = AsyncMock(return_value=response)
+
+    with pytest.raises(ProviderPayloadError):
+        async with patched_client.stream_events_page() as page:
+            async for _ in page:
+                pass
+
+    response.release.assert_called_once()
+    assert patched_client.limiter.in_flight == 0
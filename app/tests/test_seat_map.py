@@ -0,0 +1,40 @@
+from app.aggregator.places.seat_map import SeatLayout, layout_for
+
+
+def test_positions_follow_pattern_order():
+    layout = SeatLayout("A1-1000,B1-2000")
+
+    assert layout.size == 3000
+    assert layout.position("A1") == 0
+    assert layout.position("B1") == 1000
+    assert layout.names[2999] == "B2000"
+    assert layout.position("C1") is None
+    assert layout.position("A1001") is None
+    assert layout.position("A01") is None
+
+
+def test_seat_set_membership_and_expansion():
+    seats = layout_for("A1-1000,B1-2000").compile(["B5", "A3", "A3", "A1000"])
+
+    assert "A3" in seats
+    assert "B5" in seats
+    assert "A4" not in seats
+    assert len(seats) == 3
+    assert seats.to_list() == ["A3", "A1000", "B5"]
+    # список не хранится в SeatSet: каждый ответ получает свой
+    assert seats.to_list() is not seats.to_list()
+
+
+def test_seats_outside_pattern_are_kept():
+    """Место вне схемы не теряется, хоть и не попадает в битовую карту"""
+    seats = layout_for("A1-10").compile(["A2", "VIP1"])
+
+    assert "VIP1" in seats
+    assert seats.to_list() == ["A2", "VIP1"]
+
+
+def test_unparsable_pattern_falls_back_to_strings():
+    seats = layout_for("balcony").compile(["X1", "X2"])
+
+    assert "X2" in seats
+    assert len(seats) == 2
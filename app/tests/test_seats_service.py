@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.aggregator.events import seats_service
+from app.provider.exceptions import ProviderTemporaryError
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    seats_service._seats_cache.clear()
+    yield
+    seats_service._seats_cache.clear()
+
+
+def make_client(side_effect):
+    client = MagicMock()
+
+    async def get_event_seats(event_id):
+        await asyncio.sleep(0.01)
+        return side_effect(event_id)
+
+    client.get_event_seats = AsyncMock(side_effect=get_event_seats)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call():
+    """Одновременные запросы мест одного события - один вызов провайдера"""
+    client = make_client(lambda event_id: ["A1", "A2"])
+
+    results = await asyncio.gather(
+        *(seats_service.get_available_seats("event-1", client) for _ in range(10))
+    )
+
+    assert [result.to_list() for result in results] == [["A1", "A2"]] * 10
+    client.get_event_seats.assert_awaited_once_with("event-1")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_error():
+    """Ошибка общего вызова получают все ожидающие, в кэш ничего не попадает"""
+
+    def fail(event_id):
+        raise ProviderTemporaryError(status=503)
+
+    client = make_client(fail)
+
+    results = await asyncio.gather(
+        *(seats_service.get_available_seats("event-1", client) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ProviderTemporaryError) for result in results)
+    client.get_event_seats.assert_awaited_once()
+    assert "event-1" not in seats_service._seats_cache
+
+
+class FakeSharedSeats:
+    """Общий кэш в словаре вместо таблицы seats_cache"""
+
+    rows = {}
+    prunes = []
+
+    def __init__(self, session):
+        pass
+
+    async def get_fresh(self, event_id, max_age):
+        return self.rows.get(event_id)
+
+    async def put(self, event_id, seats):
+        self.rows[event_id] = seats
+
+    async def prune(self, max_age):
+        self.prunes.append(max_age)
+        return 0
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    FakeSharedSeats.rows = {}
+    FakeSharedSeats.prunes = []
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=None)
+    monkeypatch.setattr(seats_service.settings, "SEATS_SHARED_CACHE_ENABLED", True)
+    monkeypatch.setattr(seats_service, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(seats_service, "SharedSeatsRepository", FakeSharedSeats)
+    return FakeSharedSeats.rows
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_hit_skips_provider(shared_cache):
+    """Места, уже положенные другим воркером, берутся из общего кэша"""
+    shared_cache["event-1"] = ["B7"]
+    client = make_client(lambda event_id: ["A1"])
+
+    seats = await seats_service.get_available_seats("event-1", client, "B1-10")
+    assert seats.to_list() == ["B7"]
+    client.get_event_seats.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_miss_is_filled_from_provider(shared_cache):
+    client = make_client(lambda event_id: ["A1"])
+
+    seats = await seats_service.get_available_seats("event-1", client, "A1-10")
+    assert "A1" in seats
+    assert shared_cache["event-1"] == ["A1"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("probability, prunes", [(0.0, 0), (1.0, 1)])
+async def test_shared_cache_prunes_only_sometimes(
+    shared_cache, monkeypatch, probability, prunes
+):
+    """Устаревшие строки чистятся не на каждой записи, а с заданной долей"""
+    monkeypatch.setattr(
+        seats_service.settings, "SEATS_SHARED_CACHE_PRUNE_PROBABILITY", probability
+    )
+    client = make_client(lambda event_id: ["A1"])
+
+    await seats_service.get_available_seats("event-1", client, "A1-10")
+
+    assert len(FakeSharedSeats.prunes) == prunes
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run():
+    """Одновременные вызовы с одним ключом выполняют работу один раз"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    results = await asyncio.gather(*(flight.do("sync", work) for _ in range(5)))
+
+    assert results == ["done"] * 5
+    assert len(calls) == 1
+    assert not flight.in_flight("sync")
+
+
+@pytest.mark.asyncio
+async def test_error_delivered_to_all_callers():
+    """Исключение общей работы получают все ожидающие, следующий вызов - новый"""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        flight.do("sync", fail), flight.do("sync", fail), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await flight.do("sync", lambda: asyncio.sleep(0, result="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_run():
+    """Отмена одного ожидающего не обрывает работу для остальных"""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(flight.do("sync", work))
+    second = asyncio.create_task(flight.do("sync", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 42
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app.provider.streaming import StreamedPage
+
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+PAGE = {
+    "count": 12345,
+    "next": "http://provider/api/events/?page=2",
+    "results": [
+        {"id": "1", "name": "Концерт", "place": {"id": "p", "seats": [1, 2]}},
+        {"id": "2", "name": 'Выставка "Ночь"', "place": None},
+        {"id": "3", "number_of_visitors": 1000000},
+    ],
+    "previous": None,
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+async def test_events_decoded_across_chunk_boundaries(size):
+    """События и поля страницы разбираются при любом разрезании тела на куски"""
+    body = json.dumps(PAGE, ensure_ascii=False, indent=1).encode()
+    page = StreamedPage(chunked(body, size))
+
+    events = [event async for event in page]
+
+    assert events == PAGE["results"]
+    assert page.fields == {
+        "count": 12345,
+        "next": PAGE["next"],
+        "previous": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_events_yielded_before_body_is_read():
+    """Первое событие отдаётся до того, как прочитано всё тело"""
+    body = json.dumps(PAGE).encode()
+    read = []
+
+    async def chunks():
+        for start in range(0, len(body), 16):
+            read.append(start)
+            yield body[start : start + 16]
+
+    page = aiter(StreamedPage(chunks()))
+    first = await anext(page)
+
+    assert first == PAGE["results"][0]
+    assert len(read) * 16 < len(body)
+
+
+@pytest.mark.asyncio
+async def test_truncated_body_raises():
+    """Оборванное тело - ошибка разбора, а не молча укороченная страница"""
+    body = json.dumps(PAGE).encode()[:-40]
+
+    with pytest.raises(json.JSONDecodeError):
+        async for _ in StreamedPage(chunked(body, 8)):
+            pass
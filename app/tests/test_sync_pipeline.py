@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.sync.pipeline import SyncBatch, SyncPipeline
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def decode(page):
+    batch = SyncBatch()
+    for number in page:
+        changed_at = BASE + timedelta(seconds=number)
+        batch.add(
+            {"id": "place", "changed_at": changed_at},
+            {"id": str(number), "changed_at": changed_at},
+        )
+    return batch
+
+
+async def iterate(pages, delay=0.0):
+    for page in pages:
+        await asyncio.sleep(delay)
+        yield page
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_by_size():
+    """Писатель копит страницы до batch_size событий"""
+    written = []
+
+    async def write(batch):
+        written.append(sorted(batch.events))
+
+    pipeline = SyncPipeline(
+        iterate([[1, 2], [3, 4], [5]]), decode, write, batch_size=4, flush_interval=60
+    )
+    await pipeline.run()
+
+    assert written == [["1", "2", "3", "4"], ["5"]]
+    assert pipeline.stats["fetch"]["items"] == 3
+    assert pipeline.stats["decode"]["items"] == 5
+    assert pipeline.stats["write"]["items"] == 5
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_by_interval():
+    """Неполная пачка сбрасывается по истечении flush_interval"""
+    written = []
+
+    async def write(batch):
+        written.append(sorted(batch.events))
+
+    pipeline = SyncPipeline(
+        iterate([[1], [2]], delay=0.05),
+        decode,
+        write,
+        batch_size=100,
+        flush_interval=0.01,
+    )
+    await pipeline.run()
+
+    assert written == [["1"], ["2"]]
+
+
+def test_batch_keeps_latest_place():
+    """Площадка из нескольких событий попадает в пачку один раз, в свежей версии"""
+    batch = decode([3, 1, 2])
+
+    assert list(batch.places) == ["place"]
+    assert batch.places["place"]["changed_at"] == BASE + timedelta(seconds=3)
+    assert batch.max_cursor == (BASE + timedelta(seconds=3), "3")
+
+
+@pytest.mark.asyncio
+async def test_writer_error_stops_pipeline():
+    """Ошибка записи останавливает загрузку и пробрасывается наружу"""
+    fetched = []
+
+    async def pages():
+        for number in range(100):
+            fetched.append(number)
+            yield [number]
+
+    async def write(batch):
+        raise RuntimeError("db is down")
+
+    pipeline = SyncPipeline(pages(), decode, write, queue_size=1, batch_size=1)
+    with pytest.raises(RuntimeError):
+        await pipeline.run()
+
+    assert len(fetched) < 100
@@ -0,0 +1,55 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.sync import router as router_module
+from app.sync.router import trigger_sync
+
+
+@pytest.fixture
+def sync_repo():
+    repo = MagicMock(owner="this-replica")
+    repo.lease_owner = AsyncMock(return_value=None)
+    return repo
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Подменяет запуск прогона: результат задачи задаёт тест"""
+    outcome = {"completed": True, "calls": 0}
+
+    def start_sync_task(reconcile=False):
+        outcome["calls"] += 1
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(outcome["completed"])
+        return future
+
+    monkeypatch.setattr(router_module, "start_sync_task", start_sync_task)
+    monkeypatch.setattr(
+        router_module, "sync_in_progress", lambda reconcile=False: False
+    )
+    return outcome
+
+
+@pytest.mark.asyncio
+async def test_trigger_reports_lease_held_elsewhere(sync_repo, started):
+    """Аренда у другой реплики: прогон не запускается, ответ говорит об этом"""
+    sync_repo.lease_owner.return_value = "other-replica"
+
+    response = await trigger_sync(wait=False, reconcile=False, sync_repo=sync_repo)
+
+    assert response == {"status": "Синхронизация уже выполняется на другой реплике"}
+    assert started["calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_trigger_with_wait_reports_skipped_run(sync_repo, started):
+    """Прогон, пропущенный из-за чужой блокировки, не выдаётся за завершённый"""
+    started["completed"] = False
+
+    response = await trigger_sync(wait=True, reconcile=False, sync_repo=sync_repo)
+
+    assert response == {
+        "status": "Синхронизация пропущена: блокировку держит другой прогон"
+    }
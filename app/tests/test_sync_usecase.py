@@ -0,0 +1,417 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.benchmarks.synthetic import make_events
+from app.config import settings
+from app.provider.exceptions import ProviderPayloadError
+from app.provider.paginator import EventsPage
+from app.provider.records import EventRecord
+from app.sync import usecase as usecase_module
+from app.sync.exceptions import SyncLockLost
+from app.sync.usecase import SyncEventsUsecase
+
+
+@pytest.fixture
+def usecase():
+    """Usecase синхронизации с замоканными клиентом и репозиториями"""
+    client = MagicMock()
+    client.bytes_received = Counter()
+    client.close = AsyncMock()
+    place_repo = MagicMock()
+    place_repo.upsert_many = AsyncMock(return_value=(0, 0))
+    place_repo.session.commit = AsyncMock()
+    place_repo.session.rollback = AsyncMock()
+    event_repo = MagicMock()
+    event_repo.upsert_many = AsyncMock(return_value=(0, 0))
+    sync_repo = MagicMock()
+    sync_repo.get = AsyncMock(return_value=None)
+    sync_repo.release_lock = AsyncMock()
+    sync_repo.save_checkpoint = AsyncMock()
+    sync_repo.confirm_lock = AsyncMock()
+    run_repo = MagicMock()
+    run_repo.start = AsyncMock(return_value=MagicMock(id=1))
+    run_repo.finish = AsyncMock()
+    run_repo.stage_seen = AsyncMock()
+    run_repo.mark_unseen_removed = AsyncMock(return_value=0)
+    run_repo.clear_seen = AsyncMock()
+    run_repo.purge_stale_seen = AsyncMock()
+    return SyncEventsUsecase(client, place_repo, event_repo, sync_repo, run_repo)
+
+
+@pytest.mark.asyncio
+async def test_page_written_with_single_upsert(usecase):
+    """Страница провайдера пишется одним upsert площадок и одним upsert событий"""
+    events = make_events(10, places_count=2)
+    usecase.client.get_events_page = AsyncMock(
+        return_value={"next": None, "results": events}
+    )
+
+    await usecase.execute()
+
+    usecase.place_repo.upsert_many.assert_awaited_once()
+    usecase.event_repo.upsert_many.assert_awaited_once()
+    place_rows = usecase.place_repo.upsert_many.await_args.args[0]
+    event_rows = usecase.event_repo.upsert_many.await_args.args[0]
+    assert len(place_rows) == len({e["place"]["id"] for e in events})
+    assert len(event_rows) == 10
+
+
+@pytest.mark.asyncio
+async def test_duplicate_event_keeps_latest_version(usecase):
+    """Повтор события в пачке не попадает в upsert дважды - остаётся свежая версия"""
+    old, new = make_events(2, places_count=1)
+    new["id"] = old["id"]
+    usecase.client.get_events_page = AsyncMock(
+        return_value={"next": None, "results": [new, old]}
+    )
+
+    await usecase.execute()
+
+    (event_row,) = usecase.event_repo.upsert_many.await_args.args[0]
+    assert event_row["name"] == new["name"]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_place_written_once_per_run(usecase):
+    """Площадка с тем же отпечатком не отправляется в БД повторно в рамках прогона"""
+    first, second = make_events(2, places_count=1)
+
+    for event in (first, second):
+        page = EventsPage([EventRecord.from_payload(event)], None)
+        await usecase._write_batch(usecase._decode_page(page))
+
+    usecase.place_repo.upsert_many.assert_awaited_once()
+    assert usecase.event_repo.upsert_many.await_count == 2
+
+
+def test_content_hash_tracks_payload_changes(usecase):
+    """Отпечаток меняется вместе с содержимым события и стабилен без изменений"""
+    (event,) = make_events(1)
+    row = usecase._event_row(EventRecord.from_payload(event))
+    same = usecase._event_row(EventRecord.from_payload(dict(event)))
+    changed = usecase._event_row(
+        EventRecord.from_payload({**event, "name": "Другое название"})
+    )
+
+    assert row["content_hash"] == same["content_hash"]
+    assert changed["content_hash"] != same["content_hash"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_cursor_uses_exact_timestamp(usecase):
+    """Курсор уходит провайдеру с полной точностью, совпадения разрешаются по id"""
+    events = make_events(3, places_count=1)
+    for event in events:
+        event["changed_at"] = events[0]["changed_at"]
+    events.sort(key=lambda event: event["id"])
+    seen, first_new, second_new = events
+    usecase.sync_repo.get.return_value = MagicMock(
+        last_changed_at=datetime.fromisoformat(seen["changed_at"]),
+        last_event_id=seen["id"],
+        checkpoint_changed_at=None,
+    )
+    usecase.client.get_events_page = AsyncMock(
+        return_value={"next": None, "results": events}
+    )
+
+    await usecase.execute()
+
+    usecase.client.get_events_page.assert_awaited_once_with(
+        changed_at=datetime.fromisoformat(seen["changed_at"]).isoformat()
+    )
+    event_rows = usecase.event_repo.upsert_many.await_args.args[0]
+    assert {row["id"] for row in event_rows} == {first_new["id"], second_new["id"]}
+    usecase.sync_repo.release_lock.assert_awaited_once_with(
+        success=True,
+        last_changed_at=datetime.fromisoformat(second_new["changed_at"]),
+        last_event_id=second_new["id"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_commits_checkpoint_every_n_pages(usecase, monkeypatch, paged_provider):
+    """Каждые N страниц данные фиксируются вместе с чекпоинтом"""
+    monkeypatch.setattr(settings, "SYNC_COMMIT_EVERY_PAGES", 1)
+    monkeypatch.setattr(settings, "SYNC_BATCH_SIZE", 1)
+    events = make_events(3, places_count=1)
+    usecase.client.get_events_page = paged_provider([[event] for event in events])
+
+    await usecase.execute()
+
+    checkpoints = [c.args[1] for c in usecase.sync_repo.save_checkpoint.await_args_list]
+    assert checkpoints == [events[0]["id"], events[1]["id"]]
+    last = events[-1]
+    usecase.sync_repo.release_lock.assert_awaited_once_with(
+        success=True,
+        last_changed_at=datetime.fromisoformat(last["changed_at"]),
+        last_event_id=last["id"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_aborts_run(usecase, monkeypatch, paged_provider):
+    """Перехваченная аренда обрывает прогон до коммита данных"""
+    monkeypatch.setattr(settings, "SYNC_COMMIT_EVERY_PAGES", 1)
+    monkeypatch.setattr(settings, "SYNC_BATCH_SIZE", 1)
+    usecase.client.get_events_page = paged_provider([[e] for e in make_events(3)])
+    usecase.sync_repo.save_checkpoint.side_effect = SyncLockLost("other")
+
+    with pytest.raises(SyncLockLost):
+        await usecase.execute()
+
+    usecase.place_repo.session.commit.assert_not_awaited()
+    usecase.place_repo.session.rollback.assert_awaited_once()
+
+
+def offset_provider(catalog, fail_at=None, before_fail=None):
+    """Мок get_events_page с пагинацией по смещению, как у провайдера.
+
+    Ссылка next хранит фильтр changed_at и смещение, поэтому после
+    изменения каталога по той же ссылке отдаётся уже другая страница.
+    """
+
+    async def get_events_page(changed_at=None, url=None):
+        if url is not None:
+            changed_at, offset = url.split("|")
+            offset = int(offset)
+        else:
+            offset = 0
+        since = datetime.fromisoformat(changed_at)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        rows = [
+            event
+            for event in sorted(catalog, key=lambda event: event["changed_at"])
+            if datetime.fromisoformat(event["changed_at"]) >= since
+        ]
+        if offset == fail_at:
+            await before_fail()
+            raise RuntimeError("provider went away")
+        next_url = f"{changed_at}|{offset + 1}" if offset + 1 < len(rows) else None
+        return {"next": next_url, "results": rows[offset : offset + 1]}
+
+    return AsyncMock(side_effect=get_events_page)
+
+
+@pytest.mark.asyncio
+async def test_resumes_from_checkpoint_cursor(usecase, monkeypatch):
+    """Прерванный прогон продолжается с курсора чекпоинта: событие, сдвинутое
+    изменением каталога между прогонами, не теряется"""
+    monkeypatch.setattr(settings, "SYNC_COMMIT_EVERY_PAGES", 1)
+    monkeypatch.setattr(settings, "SYNC_BATCH_SIZE", 1)
+    events = make_events(4, places_count=1)
+    first, second = events[0], events[1]
+
+    async def checkpoint_committed():
+        while not usecase.sync_repo.save_checkpoint.await_count:
+            await asyncio.sleep(0)
+
+    usecase.client.get_events_page = offset_provider(
+        events, fail_at=1, before_fail=checkpoint_committed
+    )
+    with pytest.raises(RuntimeError):
+        await usecase.execute()
+    max_changed_at, max_event_id = usecase.sync_repo.save_checkpoint.await_args.args
+    assert max_event_id == first["id"]
+
+    # первое событие изменилось и ушло в конец: страницы по смещению
+    # сдвинулись, и ссылка «страница 1» указывала бы уже на третье событие
+    first["changed_at"] = (
+        datetime.fromisoformat(events[-1]["changed_at"]) + timedelta(seconds=1)
+    ).isoformat()
+    usecase.sync_repo.get.return_value = MagicMock(
+        last_changed_at=None,
+        last_event_id=None,
+        checkpoint_changed_at=max_changed_at,
+        checkpoint_event_id=max_event_id,
+    )
+    usecase.event_repo.upsert_many.reset_mock()
+    usecase.client.get_events_page = offset_provider(events)
+
+    await usecase.execute()
+
+    usecase.client.get_events_page.assert_any_await(
+        changed_at=max_changed_at.isoformat()
+    )
+    written = [
+        row["id"]
+        for call in usecase.event_repo.upsert_many.await_args_list
+        for row in call.args[0]
+    ]
+    assert written == [second["id"], events[2]["id"], events[3]["id"], first["id"]]
+    usecase.sync_repo.release_lock.assert_awaited_with(
+        success=True,
+        last_changed_at=datetime.fromisoformat(first["changed_at"]),
+        last_event_id=first["id"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_reconcile_walks_full_catalog_and_flags_missing(
+    usecase, monkeypatch, paged_provider
+):
+    """Сверка обходит весь каталог, копит id и помечает пропавшие пачками"""
+    monkeypatch.setattr(settings, "SYNC_REMOVE_BATCH_SIZE", 2)
+    events = make_events(3, places_count=1)
+    usecase.sync_repo.get.return_value = MagicMock(
+        last_changed_at=datetime.fromisoformat(events[-1]["changed_at"]),
+        last_event_id=events[-1]["id"],
+        checkpoint_changed_at=datetime.fromisoformat(events[1]["changed_at"]),
+    )
+    usecase.client.get_events_page = paged_provider([events])
+    usecase.run_repo.mark_unseen_removed.side_effect = [2, 2, 1]
+
+    await usecase.execute(reconcile=True)
+
+    usecase.client.get_events_page.assert_awaited_once_with(changed_at="2000-01-01")
+    (staged,) = usecase.run_repo.stage_seen.await_args_list
+    assert set(staged.args[1]) == {event["id"] for event in events}
+    assert usecase.run_repo.mark_unseen_removed.await_count == 3
+    usecase.run_repo.purge_stale_seen.assert_awaited_once_with(1)
+    usecase.run_repo.clear_seen.assert_awaited_once_with(1)
+    assert usecase.run_repo.finish.await_args.kwargs["rows_removed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_reconcile_with_lost_lease_flags_nothing(usecase, paged_provider):
+    """Сверка, чью аренду перехватили, не помечает события пропавшими"""
+    usecase.client.get_events_page = paged_provider([make_events(3)])
+    usecase.sync_repo.confirm_lock.side_effect = SyncLockLost("other")
+
+    with pytest.raises(SyncLockLost):
+        await usecase.execute(reconcile=True)
+
+    usecase.place_repo.session.commit.assert_not_awaited()
+    usecase.run_repo.mark_unseen_removed.assert_not_awaited()
+    usecase.run_repo.clear_seen.assert_awaited_once_with(1)
+
+
+@pytest.mark.asyncio
+async def test_failed_cleanup_keeps_original_error(usecase, paged_provider):
+    """Сбой очистки промежуточных id не подменяет ошибку самой сверки"""
+    usecase.client.get_events_page = paged_provider([make_events(3)])
+    usecase.sync_repo.confirm_lock.side_effect = SyncLockLost("other")
+    usecase.run_repo.clear_seen.side_effect = RuntimeError("db is gone")
+
+    with pytest.raises(SyncLockLost):
+        await usecase.execute(reconcile=True)
+
+    usecase.run_repo.clear_seen.assert_awaited_once_with(1)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_of_empty_catalog_flags_nothing(usecase):
+    """Пустой ответ провайдера не превращается в удаление всего каталога"""
+    usecase.client.get_events_page = AsyncMock(
+        return_value={"next": None, "results": []}
+    )
+
+    await usecase.execute(reconcile=True)
+
+    usecase.run_repo.mark_unseen_removed.assert_not_awaited()
+    usecase.run_repo.clear_seen.assert_awaited_once_with(1)
+
+
+@pytest.fixture
+def refresh_repos(monkeypatch):
+    """Репозитории собственной сессии точечного обновления"""
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=None)
+    session.commit = AsyncMock()
+    place_repo = MagicMock(upsert_many=AsyncMock(return_value=(0, 0)))
+    event_repo = MagicMock(upsert_many=AsyncMock(return_value=(0, 0)))
+    monkeypatch.setattr(usecase_module, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(usecase_module, "PlaceRepository", lambda s: place_repo)
+    monkeypatch.setattr(usecase_module, "EventRepository", lambda s: event_repo)
+    return session, event_repo
+
+
+@pytest.mark.asyncio
+async def test_refresh_event_skips_fresh_row(usecase):
+    """Свежая локальная строка не требует обращения к провайдеру"""
+    usecase.event_repo.get = AsyncMock(
+        return_value=MagicMock(synced_at=datetime.now(timezone.utc))
+    )
+    usecase.client.get_event = AsyncMock()
+
+    await usecase.refresh_event("event-1")
+
+    usecase.client.get_event.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refresh_event_fetches_only_stale_event(usecase, refresh_repos):
+    """Устаревшее событие обновляется одним запросом, без полной синхронизации"""
+    (event,) = make_events(1)
+    usecase.event_repo.get = AsyncMock(
+        return_value=MagicMock(synced_at=datetime.now(timezone.utc) - timedelta(days=1))
+    )
+    usecase.event_repo.session.refresh = AsyncMock()
+    usecase.client.get_event = AsyncMock(return_value=event)
+    usecase.client.get_events_page = AsyncMock()
+
+    await usecase.refresh_event(event["id"])
+
+    usecase.client.get_event.assert_awaited_once_with(event["id"])
+    usecase.client.get_events_page.assert_not_awaited()
+    session, event_repo = refresh_repos
+    event_repo.upsert_many.assert_awaited_once()
+    assert event_repo.upsert_many.await_args.kwargs == {"only_changed": False}
+    session.commit.assert_awaited_once()
+    # вызывающий перечитывает строку в своей сессии
+    usecase.event_repo.session.refresh.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_request(usecase, refresh_repos):
+    """Одновременные обновления одного события делают один запрос к провайдеру"""
+    (event,) = make_events(1)
+    usecase.event_repo.get = AsyncMock(return_value=None)
+
+    async def get_event(event_id):
+        await asyncio.sleep(0.01)
+        return event
+
+    usecase.client.get_event = AsyncMock(side_effect=get_event)
+
+    await asyncio.gather(*(usecase.refresh_event(event["id"]) for _ in range(3)))
+
+    usecase.client.get_event.assert_awaited_once_with(event["id"])
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_break_shared_refresh(usecase, refresh_repos):
+    """Отмена первого вызывающего не мешает общей записи и ожидающим"""
+    (event,) = make_events(1)
+    usecase.event_repo.get = AsyncMock(return_value=None)
+
+    async def get_event(event_id):
+        await asyncio.sleep(0.02)
+        return event
+
+    usecase.client.get_event = AsyncMock(side_effect=get_event)
+
+    leader = asyncio.create_task(usecase.refresh_event(event["id"]))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(usecase.refresh_event(event["id"]))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    await follower
+    session, _ = refresh_repos
+    session.commit.assert_awaited_once()
+    usecase.event_repo.session.commit.assert_not_called()
+
+
+def test_invalid_event_payload_rejected():
+    """Событие без обязательного поля отвергается при разборе, а не при записи"""
+    (event,) = make_events(1)
+    del event["event_time"]
+
+    with pytest.raises(ProviderPayloadError):
+        EventRecord.from_payload(event)
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def loader(values):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return values[len(calls) - 1]
+
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_served_without_load():
+    cache = TTLCache(max_entries=10, ttl=30, clock=FakeClock())
+    load, calls = loader(["v1"])
+
+    assert await cache.get("k", load) == "v1"
+    assert await cache.get("k", load) == "v1"
+    assert len(calls) == 1
+    assert cache.snapshot()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_one_refresh_runs():
+    """Устаревшее значение отдаётся сразу, обновление в фоне - одно"""
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl=30, stale_ttl=30, clock=clock)
+    load, calls = loader(["v1", "v2"])
+    await cache.get("k", load)
+
+    clock.now = 40
+    stale = await asyncio.gather(*(cache.get("k", load) for _ in range(5)))
+    assert stale == ["v1"] * 5
+    await asyncio.sleep(0.01)
+
+    assert len(calls) == 2
+    assert await cache.get("k", load) == "v2"
+    assert cache.stale_hits == 5
+
+
+@pytest.mark.asyncio
+async def test_expired_past_stale_window_is_a_miss():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl=30, stale_ttl=30, clock=clock)
+    load, _ = loader(["v1", "v2"])
+    await cache.get("k", load)
+
+    clock.now = 61
+    assert await cache.get("k", load) == "v2"
+    assert cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_value():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl=30, stale_ttl=30, clock=clock)
+    cache.set("k", "v1")
+
+    async def fail():
+        raise RuntimeError("provider down")
+
+    clock.now = 40
+    assert await cache.get("k", fail) == "v1"
+    await asyncio.sleep(0.01)
+    assert cache.refresh_errors == 1
+    assert await cache.get("k", fail) == "v1"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl=30, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert "a" not in cache
+    assert len(cache) == 2
+    assert cache.evictions == 1
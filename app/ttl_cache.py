@@ -0,0 +1,117 @@
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Tuple,
+    TypeVar,
+)
+
+from app.logger import logger
+from app.singleflight import SingleFlight
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Ограниченный LRU-кэш с TTL и stale-while-revalidate.
+
+    Запись свежа ttl секунд. Ещё stale_ttl секунд после этого она отдаётся
+    сразу, а в фоне запускается одно обновление; позже - считается
+    промахом. Одновременные промахи и обновления по одному ключу склеиваются
+    в один вызов load. Чтение не берёт блокировок: все операции со словарём
+    синхронные и в пределах одного event loop атомарны.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._flight = SingleFlight()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        """Значение из кэша или результат load, который попадает в кэш"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._flight.start(key, lambda: self._refresh(key, load))
+                return entry[1]
+
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._load(key, load))
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        value = await load()
+        self.set(key, value)
+        return value
+
+    async def _refresh(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        """Фоновое обновление: при ошибке остаётся устаревшее значение"""
+        try:
+            return await self._load(key, load)
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(
+                "Не удалось обновить запись кэша",
+                extra={"key": str(key), "error": str(e)},
+            )
+            raise
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors,
+            "hit_rate": (
+                round((self.hits + self.stale_hits) / lookups, 3) if lookups else None
+            ),
+        }